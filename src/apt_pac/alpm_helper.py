@@ -2,11 +2,153 @@
 Helper utilities for pyalpm operations.
 """
 
+import json
+import os
+import re
+import threading
 import pyalpm
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from datetime import datetime
+from functools import cmp_to_key, lru_cache
+from itertools import chain
 from pathlib import Path
-from typing import List, Optional
+from typing import Any, Dict, Iterable, List, Optional
+from .config import get_config
+
+
+@dataclass
+class _State:
+    """A registered handle plus the indexes derived from its sync DBs."""
+
+    handle: Any
+    syncdbs: List  # Registered sync DBs, in registration order
+    syncdb_by_name: Dict[str, Any]
+    # Built lazily on first use:
+    sync_by_name: Optional[Dict[str, Any]] = None  # pkgname -> Package
+    sync_names: Optional[frozenset] = None  # Every sync package name
+    repo_provides: Optional[Dict[str, Any]] = None  # provide -> Package
+
+
+_state: Optional[_State] = None
+_lock = threading.Lock()
+
+SYNC_DIR = Path("/var/lib/pacman/sync")
+
+# Package file name: pkgname-pkgver-pkgrel-arch.pkg.tar[.ext]
+# pkgver and pkgrel cannot contain hyphens, pkgname can.
+_PKG_RE = re.compile(
+    r"^(.+)-([^-]+)-([^-]+)-([^-]+)\.pkg\.tar(?:\.(?:zst|xz|gz|lzo|lz4))?$"
+)
+# One version segment and the separator run before it (rpmvercmp's view)
+_VER_SEGMENT_RE = re.compile(r"([^0-9A-Za-z]*)([0-9]+|[A-Za-z]+)")
+_DEP_CONSTRAINT_RE = re.compile(r"[<>=]")
+
+# Continuation indent for multi-line values (aligned under the value column)
+_OPTDEP_INDENT = " " * 21
+
+# Optional Package attributes differ between pyalpm versions; probe the type
+# once here instead of calling hasattr() on every formatted package.
+try:
+    _PKG_TYPE = pyalpm.Package
+except AttributeError:
+    _PKG_TYPE = None
+_HAS_DB = _PKG_TYPE is None or hasattr(_PKG_TYPE, "db")
+_HAS_MD5 = _PKG_TYPE is None or hasattr(_PKG_TYPE, "md5sum")
+_HAS_SHA256 = _PKG_TYPE is None or hasattr(_PKG_TYPE, "sha256sum")
+_HAS_SCRIPTLET = _PKG_TYPE is None or hasattr(_PKG_TYPE, "has_scriptlet")
+_HAS_REQUIREDBY = _PKG_TYPE is None or hasattr(_PKG_TYPE, "compute_requiredby")
+_HAS_OPTIONALFOR = _PKG_TYPE is None or hasattr(
+    _PKG_TYPE, "compute_optionalfor"
+)
+
+# (flag, label) pairs for the -Qi "Validated By" field, in pacman's order
+_VALIDATION_FLAGS = (
+    (pyalpm.PKG_VALIDATION_NONE, "None"),
+    (pyalpm.PKG_VALIDATION_MD5SUM, "MD5 Sum"),
+    (pyalpm.PKG_VALIDATION_SHA256SUM, "SHA256 Sum"),
+    (pyalpm.PKG_VALIDATION_SIGNATURE, "Signature"),
+)
+
+
+def _syncdbs_cache_file() -> Optional[Path]:
+    cache_dir = get_config().cache_dir
+    return cache_dir / "syncdbs.json" if cache_dir else None
+
+
+def _discover_syncdb_names(sync_dir: Path) -> List[str]:
+    """
+    List the sync DB names in sync_dir (*.db files).
+    The list is persisted in the apt-pac cache together with the directory
+    mtime, which changes whenever a DB file is added, removed or replaced,
+    so unchanged directories skip the glob.
+    """
+    try:
+        stamp = sync_dir.stat().st_mtime_ns
+    except OSError:
+        return []
+
+    cache_file = _syncdbs_cache_file()
+    if cache_file:
+        try:
+            with open(cache_file, "r", encoding="utf-8") as f:
+                cached = json.load(f)
+            if cached.get("stamp") == stamp:
+                return cached["names"]
+        except (OSError, ValueError, KeyError, AttributeError):
+            pass  # Missing or unreadable: rebuild below
+
+    names = [dbfile.stem for dbfile in sync_dir.glob("*.db")]  # Drop .db
+
+    if cache_file:
+        # Write to a temp file and rename over the cache, so a crash or a
+        # concurrent run never leaves a truncated file behind
+        tmp = cache_file.with_name(f"{cache_file.name}.{os.getpid()}.tmp")
+        try:
+            with open(tmp, "w", encoding="utf-8") as f:
+                json.dump({"stamp": stamp, "names": names}, f)
+            os.replace(tmp, cache_file)
+        except OSError:
+            try:
+                tmp.unlink()
+            except OSError:
+                pass
+    return names
+
+
+def _build_state() -> _State:
+    handle = pyalpm.Handle("/", "/var/lib/pacman")
+    # Register standard sync databases
+    # We read from the actual sync directory to auto-discover DBs
+    sync_dir = SYNC_DIR
+    if sync_dir.exists():
+        for dbname in _discover_syncdb_names(sync_dir):
+            try:
+                handle.register_syncdb(dbname, pyalpm.SIG_DATABASE_OPTIONAL)
+            except Exception:
+                pass  # Skip if registration fails
+
+    # Cache the DB wrappers once; get_syncdbs() crosses into libalpm
+    # and rebuilds the Python list on every call.
+    syncdbs = handle.get_syncdbs()
+    return _State(
+        handle=handle,
+        syncdbs=syncdbs,
+        syncdb_by_name={db.name: db for db in syncdbs},
+    )
 
-_handle = None
+
+def _get_state() -> _State:
+    global _state
+    state = _state
+    if state is None:
+        with _lock:
+            # Another thread may have built it while we waited
+            if _state is None:
+                _state = _build_state()
+            state = _state
+    return state
 
 
 def get_handle():
@@ -14,20 +156,27 @@ def get_handle():
     Get or create a pyalpm Handle with standard configuration.
     This reuses the same handle for efficiency.
     """
-    global _handle
-    if _handle is None:
-        _handle = pyalpm.Handle("/", "/var/lib/pacman")
-        # Register standard sync databases
-        # We read from the actual sync directory to auto-discover DBs
-        sync_dir = Path("/var/lib/pacman/sync")
-        if sync_dir.exists():
-            for dbfile in sync_dir.glob("*.db"):
-                dbname = dbfile.stem  # Remove .db extension
-                try:
-                    _handle.register_syncdb(dbname, pyalpm.SIG_DATABASE_OPTIONAL)
-                except Exception:
-                    pass  # Skip if registration fails
-    return _handle
+    return _get_state().handle
+
+
+def refresh():
+    """
+    Drop the cached handle and everything derived from it.
+    Call after the sync databases change on disk (e.g. after pacman -Sy).
+    """
+    global _state
+    with _lock:
+        _state = None
+
+
+def get_syncdbs_cached() -> List:
+    """Get the registered sync databases (cached at registration time)."""
+    return _get_state().syncdbs
+
+
+def get_syncdb(name: str):
+    """Get a registered sync database by name, or None."""
+    return _get_state().syncdb_by_name.get(name)
 
 
 def search_packages(query: str, repos: Optional[List[str]] = None) -> List:
@@ -41,14 +190,12 @@ def search_packages(query: str, repos: Optional[List[str]] = None) -> List:
     Returns:
         List of Package objects matching the query
     """
-    handle = get_handle()
     results = []
 
-    dbs = handle.get_syncdbs()
+    dbs = get_syncdbs_cached()
     if repos:
         # Filter to requested repos
-        repo_dict = {db.name: db for db in dbs}
-        dbs = [repo_dict[r] for r in repos if r in repo_dict]
+        dbs = [db for db in (get_syncdb(r) for r in repos) if db is not None]
 
     for db in dbs:
         # db.search() takes variable args (multiple keywords)
@@ -68,23 +215,38 @@ def get_package(pkgname: str, repo: Optional[str] = None):
     Returns:
         Package object or None
     """
-    handle = get_handle()
-
     if repo:
         # Search specific repo
-        for db in handle.get_syncdbs():
-            if db.name == repo:
-                return db.get_pkg(pkgname)
-        return None
+        db = get_syncdb(repo)
+        return db.get_pkg(pkgname) if db else None
     else:
         # Search all repos (first match wins)
-        for db in handle.get_syncdbs():
+        for db in get_syncdbs_cached():
             pkg = db.get_pkg(pkgname)
             if pkg:
                 return pkg
         return None
 
 
+def get_packages(names: Iterable[str]) -> dict:
+    """
+    Look up many package names in the sync repos at once.
+
+    Args:
+        names: Package names
+
+    Returns:
+        Dict of {name: Package} for the names found (first repo wins)
+    """
+    sync_by_name = get_sync_packages_by_name()
+    found = {}
+    for name in names:
+        pkg = sync_by_name.get(name)
+        if pkg is not None:
+            found[name] = pkg
+    return found
+
+
 def get_local_package(pkgname: str):
     """Get an installed package by name."""
     handle = get_handle()
@@ -107,22 +269,27 @@ def get_installed_packages(
     """
     handle = get_handle()
     localdb = handle.get_localdb()
-    packages = list(localdb.pkgcache)
 
-    if foreign_only:
-        # Filter to packages not in any sync DB
-        sync_pkgs = set()
-        for db in handle.get_syncdbs():
-            sync_pkgs.update(pkg.name for pkg in db.pkgcache)
-        packages = [pkg for pkg in packages if pkg.name not in sync_pkgs]
+    if not (foreign_only or explicit_only or deps_only):
+        return list(localdb.pkgcache)
+
+    # Single pass with a combined predicate instead of one list per filter
+    sync_names = get_sync_pkg_names() if foreign_only else None
+    explicit = pyalpm.PKG_REASON_EXPLICIT
+    depend = pyalpm.PKG_REASON_DEPEND
 
-    if explicit_only:
-        packages = [pkg for pkg in packages if pkg.reason == pyalpm.PKG_REASON_EXPLICIT]
+    return [
+        pkg
+        for pkg in localdb.pkgcache
+        if (not foreign_only or pkg.name not in sync_names)
+        and (not explicit_only or pkg.reason == explicit)
+        and (not deps_only or pkg.reason == depend)
+    ]
 
-    if deps_only:
-        packages = [pkg for pkg in packages if pkg.reason == pyalpm.PKG_REASON_DEPEND]
 
-    return packages
+def _dep_name(dep: str) -> str:
+    """Strip a version constraint from a depend/provide ('foo>=1' -> 'foo')."""
+    return _DEP_CONSTRAINT_RE.split(dep, 1)[0]
 
 
 def get_orphan_packages() -> List:
@@ -134,16 +301,53 @@ def get_orphan_packages() -> List:
     """
     handle = get_handle()
     localdb = handle.get_localdb()
-
-    orphans = []
-    for pkg in localdb.pkgcache:
-        if pkg.reason == pyalpm.PKG_REASON_DEPEND:
-            # Check if any package requires this one
-            rdeps = pkg.compute_requiredby()
-            if not rdeps:
-                orphans.append(pkg)
-
-    return orphans
+    packages = localdb.pkgcache
+
+    # Reverse dependency index built in one pass, instead of asking libalpm
+    # to walk the depends graph (compute_requiredby) once per package.
+    # A dependency is satisfied by a package name or anything it provides.
+    providers = defaultdict(list)  # name or provide -> installed pkgnames
+    for pkg in packages:
+        providers[pkg.name].append(pkg.name)
+        for prov in pkg.provides:
+            providers[_dep_name(prov)].append(pkg.name)
+
+    required = set()
+    for pkg in packages:
+        for dep in pkg.depends:
+            required.update(providers.get(_dep_name(dep), ()))
+
+    depend = pyalpm.PKG_REASON_DEPEND
+    return [
+        pkg
+        for pkg in packages
+        if pkg.reason == depend and pkg.name not in required
+    ]
+
+
+def get_sync_packages_by_name() -> dict:
+    """
+    Get a {name: Package} map over all sync repos, in repo priority order
+    (first repo wins). Built in one pass and reused until refresh().
+    """
+    state = _get_state()
+    if state.sync_by_name is None:
+        sync_by_name = {}
+        for db in state.syncdbs:
+            for pkg in db.pkgcache:
+                sync_by_name.setdefault(pkg.name, pkg)
+        state.sync_by_name = sync_by_name
+    return state.sync_by_name
+
+
+def get_sync_pkg_names() -> frozenset:
+    """Get the names of all packages in the sync repos (cached)."""
+    state = _get_state()
+    if state.sync_names is None:
+        state.sync_names = frozenset(
+            pkg.name for db in state.syncdbs for pkg in db.pkgcache
+        )
+    return state.sync_names
 
 
 def get_available_updates() -> List[tuple]:
@@ -157,13 +361,12 @@ def get_available_updates() -> List[tuple]:
     localdb = handle.get_localdb()
     updates = []
 
+    # One hashed lookup per local package instead of get_pkg() per sync DB
+    sync_by_name = get_sync_packages_by_name()
+
     for local_pkg in localdb.pkgcache:
         # Find this package in sync repos
-        new_pkg = None
-        for syncdb in handle.get_syncdbs():
-            new_pkg = syncdb.get_pkg(local_pkg.name)
-            if new_pkg:
-                break
+        new_pkg = sync_by_name.get(local_pkg.name)
 
         if new_pkg:
             # Compare versions
@@ -176,11 +379,7 @@ def get_available_updates() -> List[tuple]:
 
 def get_all_repo_packages() -> List:
     """Get all packages available in sync repos."""
-    handle = get_handle()
-    packages = []
-    for db in handle.get_syncdbs():
-        packages.extend(db.pkgcache)
-    return packages
+    return list(chain.from_iterable(db.pkgcache for db in get_syncdbs_cached()))
 
 
 def is_package_installed(pkgname: str) -> bool:
@@ -188,10 +387,55 @@ def is_package_installed(pkgname: str) -> bool:
     return get_local_package(pkgname) is not None
 
 
-def get_cache_dirs() -> List[Path]:
-    """Get list of cache directories from pyalpm."""
+def get_cache_dirs() -> List[str]:
+    """Get list of cache directories from pyalpm (as plain path strings)."""
     handle = get_handle()
-    return [Path(p) for p in handle.cachedirs]
+    return list(handle.cachedirs)
+
+
+def _vercmp_segments(ver: str) -> tuple:
+    # As in alpm's rpmvercmp: a longer separator run before a segment wins,
+    # then numeric beats alpha. Running out of segments sorts above an alpha
+    # segment glued on directly and below anything else:
+    # 1.0alpha < 1.0 < 1.0.r5 < 1.0.1
+    segments = []
+    for sep, seg in _VER_SEGMENT_RE.findall(ver):
+        if seg.isdigit():
+            segments.append((2, len(sep), 1, int(seg), ""))
+        else:
+            segments.append((2 if sep else 0, len(sep), 0, 0, seg))
+    segments.append((1,))
+    return tuple(segments)
+
+
+def vercmp_key(ver: str) -> tuple:
+    """
+    Sort key matching pyalpm.vercmp for "[epoch:]pkgver-pkgrel".
+    Trailing separators and a missing pkgrel (which vercmp ignores) are
+    not modelled, so callers should confirm the order with pyalpm.vercmp.
+    """
+    epoch = 0
+    if ":" in ver:
+        head, rest = ver.split(":", 1)
+        if head.isdigit():
+            epoch, ver = int(head), rest
+    pkgver, _, pkgrel = ver.rpartition("-")
+    if not pkgver:
+        pkgver, pkgrel = pkgrel, ""
+    return (epoch, _vercmp_segments(pkgver), _vercmp_segments(pkgrel))
+
+
+def _unlink_with_sig(path: str):
+    """Remove a cached package and its detached signature, ignoring errors."""
+    try:
+        os.unlink(path)
+    except OSError:
+        return
+    # Unlinking directly saves the exists() check when there is no .sig
+    try:
+        os.unlink(path + ".sig")
+    except OSError:
+        pass
 
 
 def clean_cache(keep: int = 3, dry_run: bool = False, verbose: bool = True) -> int:
@@ -207,101 +451,75 @@ def clean_cache(keep: int = 3, dry_run: bool = False, verbose: bool = True) -> i
     Returns:
         Number of bytes freed (or would be freed)
     """
-    import os
-
     freed_bytes = 0
     cache_dirs = get_cache_dirs()
 
-    # Regex to match package files: name-version-release-arch.pkg.tar.zst (or other extensions)
-    # This is tricky because version can contain hyphens.
-    # However, standard Arch package naming is relatively strict.
-    # We can try to rely on the fact that we can listing all files and grouping them.
-    # Better approach: Use a regex that captures the known suffix structure.
-    # .pkg.tar.zst | .pkg.tar.xz | .pkg.tar.gz | .pkg.tar
-
-    # But names can also have hyphens.
     # Helper to parse filename
     def parse_pkg_filename(filename):
-        # Remove extension
-        for ext in [
-            ".pkg.tar.zst",
-            ".pkg.tar.xz",
-            ".pkg.tar.gz",
-            ".pkg.tar",
-            ".pkg.tar.lzo",
-            ".pkg.tar.lz4",
-        ]:
-            if filename.endswith(ext):
-                base = filename[: -len(ext)]
-                # Now base is name-version-release-arch
-                # arch is last, release is 2nd last...
-                parts = base.split("-")
-                if len(parts) >= 4:
-                    arch = parts[-1]
-                    # We need to reconstruct name and version.
-                    # As version can have hyphens? Generally pkgver()-release
-                    # Arch packages format: name-version-release-arch
-                    # but version itself can be like 1.2.3-1 (if release is included in version? no release is separate)
-                    # wait, verify standard:
-                    # pkgname-pkgver-pkgrel-arch.pkg.tar.zst
-                    # pkgver can contain hyphens? No, pkgver cannot contain hyphens.
-                    # pkgrel cannot contain hyphens.
-                    # So:
-                    # parts[-1] = arch
-                    # parts[-2] = pkgrel
-                    # parts[-3] = pkgver (no hyphens allowed in Arch pkgver)
-                    # parts[:-3] = name (can contain hyphens)
-
-                    pkgrel = parts[-2]
-                    pkgver = parts[-3]
-                    name = "-".join(parts[:-3])
-                    full_version = f"{pkgver}-{pkgrel}"
-                    return name, full_version, arch
-        return None, None, None
+        # One regex step: (name, pkgver, pkgrel, arch) or all None
+        m = _PKG_RE.match(filename)
+        return m.groups() if m else (None, None, None, None)
 
     # Group files by (name, arch)
     # We treat different architectures as distinct sets of packages to version
-    package_files = {}  # (name, arch) -> list of (version, filepath, size)
+    package_files = {}  # (name, arch) -> list of {version, vkey, path, entry}
 
     for cache_dir in cache_dirs:
-        if not cache_dir.exists():
+        if not os.path.isdir(cache_dir):
             continue
 
-        for child in cache_dir.iterdir():
-            if not child.is_file():
-                continue
-
-            name, version, arch = parse_pkg_filename(child.name)
-            if name and version and arch:
-                key = (name, arch)
-                if key not in package_files:
-                    package_files[key] = []
-                package_files[key].append(
-                    {"version": version, "path": child, "size": child.stat().st_size}
-                )
+        # scandir's DirEntry caches the file type (and stat), avoiding the
+        # extra syscalls and Path objects of iterdir() + is_file() + stat()
+        with os.scandir(cache_dir) as it:
+            for entry in it:
+                if not entry.is_file(follow_symlinks=False):
+                    continue
+
+                name, pkgver, pkgrel, arch = parse_pkg_filename(entry.name)
+                if name:
+                    version = f"{pkgver}-{pkgrel}"
+                    key = (name, arch)
+                    if key not in package_files:
+                        package_files[key] = []
+                    package_files[key].append(
+                        {
+                            "version": version,
+                            "vkey": vercmp_key(version),
+                            "path": entry.path,
+                            "entry": entry,
+                        }
+                    )
 
     # Process groups
     deleted_count = 0
+    to_delete_paths = []
 
     for key, files in package_files.items():
         if len(files) <= keep:
             continue
 
-        # Sort by version using pyalpm.vercmp
-        # We want descending order (newest first)
-        # functools.cmp_to_key is needed for sort
-        from functools import cmp_to_key
-
-        def compare_versions(item1, item2):
-            return pyalpm.vercmp(item1["version"], item2["version"])
+        # Sort newest first with a precomputed key (one key per file instead
+        # of a vercmp call per comparison), then confirm neighbours with
+        # pyalpm.vercmp and fall back to a full vercmp sort on disagreement.
+        files.sort(key=lambda i: i["vkey"], reverse=True)
+        if any(
+            pyalpm.vercmp(newer["version"], older["version"]) < 0
+            for newer, older in zip(files, files[1:])
+        ):
+            def compare_versions(item1, item2):
+                return pyalpm.vercmp(item1["version"], item2["version"])
 
-        files.sort(key=cmp_to_key(compare_versions), reverse=True)
+            files.sort(key=cmp_to_key(compare_versions), reverse=True)
 
         # Keep top 'keep'
         to_delete = files[keep:]
 
         for item in to_delete:
-            size = item["size"]
+            # Only files that go get stat()-ed; kept files cost no syscall
+            try:
+                size = item["entry"].stat().st_size
+            except OSError:
+                size = 0
             path = item["path"]
 
             freed_bytes += size
@@ -318,29 +536,43 @@ def clean_cache(keep: int = 3, dry_run: bool = False, verbose: bool = True) -> i
                 # To avoid circular import, we won't import from ui/commands
                 pass
 
-            if not dry_run:
-                try:
-                    os.remove(path)
-                    # Also remove signature file if exists (.sig)
-                    sig_path = path.parent / (path.name + ".sig")
-                    if sig_path.exists():
-                        os.remove(sig_path)
-                except OSError:
-                    pass
+            to_delete_paths.append(path)
+
+    # Deletions are independent unlink syscalls; keep several in flight
+    if to_delete_paths and not dry_run:
+        workers = min(32, (os.cpu_count() or 1) * 4, len(to_delete_paths))
+        with ThreadPoolExecutor(max_workers=workers) as ex:
+            list(ex.map(_unlink_with_sig, to_delete_paths))
 
     return freed_bytes
 
 
+def get_repo_provides() -> dict:
+    """
+    Get a {provided name: Package} index over all sync repos (cached).
+    Version constraints are stripped ('libfoo.so=1-64' -> 'libfoo.so').
+    """
+    state = _get_state()
+    if state.repo_provides is None:
+        provides = {}
+        for db in state.syncdbs:
+            for pkg in db.pkgcache:
+                for prov in pkg.provides:
+                    provides.setdefault(prov.split("=", 1)[0], pkg)
+        state.repo_provides = provides
+    return state.repo_provides
+
+
 def is_in_official_repos(pkgname: str) -> bool:
     """
     Check if a package exists in official repos (exact match or provider).
     """
-    handle = get_handle()
-    for db in handle.get_syncdbs():
-        # Check exact match first
-        if db.get_pkg(pkgname):
-            return True
-        # Check providers
+    if not any(c in pkgname for c in "<>="):
+        # Plain name: answer from the cached name set and provides index
+        return pkgname in get_sync_pkg_names() or pkgname in get_repo_provides()
+
+    # Versioned dependency string: let libalpm evaluate the constraint
+    for db in get_syncdbs_cached():
         if pyalpm.find_satisfier(db.pkgcache, pkgname):
             return True
     return False
@@ -351,6 +583,7 @@ def is_in_official_repos(pkgname: str) -> bool:
 # =============================================================================
 
 
+@lru_cache(maxsize=4096)
 def format_size(bytes_val: int) -> str:
     """Format byte size in human readable format (KiB, MiB, GiB)."""
     if bytes_val < 1024:
@@ -363,10 +596,9 @@ def format_size(bytes_val: int) -> str:
         return f"{bytes_val / (1024 * 1024 * 1024):.2f} GiB"
 
 
+@lru_cache(maxsize=4096)
 def format_timestamp(ts: int) -> str:
     """Format unix timestamp to readable date."""
-    from datetime import datetime
-
     try:
         return datetime.fromtimestamp(ts).strftime("%a %d %b %Y %I:%M:%S %p %Z")
     except (ValueError, OSError):
@@ -378,10 +610,17 @@ def format_optdeps(optdeps: list) -> str:
     if not optdeps:
         return "None"
     # optdeps is a list of strings "pkgname: description"
-    formatted = []
-    for dep in optdeps:
-        formatted.append(f"                     {dep}")
-    return "\n" + "\n".join(formatted)
+    return "\n" + _OPTDEP_INDENT + ("\n" + _OPTDEP_INDENT).join(optdeps)
+
+
+def _join_or(seq, sep: str = " ", empty: str = "None") -> str:
+    """Join a sequence for display, or return 'empty' when there is none."""
+    return sep.join(seq) if seq else empty
+
+
+def _format_fields(fields: list) -> str:
+    """Render (label, value) pairs as pacman-style 'Label    : value' lines."""
+    return "\n".join(f"{label:<16}: {value}" for label, value in fields)
 
 
 def format_sync_package(pkg) -> str:
@@ -394,49 +633,36 @@ def format_sync_package(pkg) -> str:
     Returns:
         Formatted string in pacman -Si format
     """
-    lines = []
-
-    lines.append(
-        f"Repository      : {pkg.db.name if hasattr(pkg, 'db') and pkg.db else 'unknown'}"
-    )
-    lines.append(f"Name            : {pkg.name}")
-    lines.append(f"Version         : {pkg.version}")
-    lines.append(f"Description     : {pkg.desc if pkg.desc else 'None'}")
-    lines.append(f"Architecture    : {pkg.arch}")
-    lines.append(f"URL             : {pkg.url if pkg.url else 'None'}")
-    lines.append(
-        f"Licenses        : {' '.join(pkg.licenses) if pkg.licenses else 'None'}"
-    )
-    lines.append(f"Groups          : {' '.join(pkg.groups) if pkg.groups else 'None'}")
-    lines.append(
-        f"Provides        : {' '.join(pkg.provides) if pkg.provides else 'None'}"
-    )
-    lines.append(
-        f"Depends On      : {' '.join(pkg.depends) if pkg.depends else 'None'}"
-    )
-    lines.append(f"Optional Deps   : {format_optdeps(pkg.optdepends)}")
-    lines.append(
-        f"Conflicts With  : {' '.join(pkg.conflicts) if pkg.conflicts else 'None'}"
-    )
-    lines.append(
-        f"Replaces        : {' '.join(pkg.replaces) if pkg.replaces else 'None'}"
-    )
-    lines.append(f"Download Size   : {format_size(pkg.size)}")
-    lines.append(f"Installed Size  : {format_size(pkg.isize)}")
-    lines.append(
-        f"Packager        : {pkg.packager if pkg.packager else 'Unknown Packager'}"
-    )
-    lines.append(f"Build Date      : {format_timestamp(pkg.builddate)}")
+    p = pkg
+    fields = [
+        ("Repository", p.db.name if _HAS_DB and p.db else "unknown"),
+        ("Name", p.name),
+        ("Version", p.version),
+        ("Description", p.desc or "None"),
+        ("Architecture", p.arch),
+        ("URL", p.url or "None"),
+        ("Licenses", _join_or(p.licenses)),
+        ("Groups", _join_or(p.groups)),
+        ("Provides", _join_or(p.provides)),
+        ("Depends On", _join_or(p.depends)),
+        ("Optional Deps", format_optdeps(p.optdepends)),
+        ("Conflicts With", _join_or(p.conflicts)),
+        ("Replaces", _join_or(p.replaces)),
+        ("Download Size", format_size(p.size)),
+        ("Installed Size", format_size(p.isize)),
+        ("Packager", p.packager or "Unknown Packager"),
+        ("Build Date", format_timestamp(p.builddate)),
+    ]
 
     # Add MD5 Sum if available
-    if hasattr(pkg, "md5sum") and pkg.md5sum:
-        lines.append(f"MD5 Sum         : {pkg.md5sum}")
+    if _HAS_MD5 and p.md5sum:
+        fields.append(("MD5 Sum", p.md5sum))
 
     # Add SHA-256 Sum if available
-    if hasattr(pkg, "sha256sum") and pkg.sha256sum:
-        lines.append(f"SHA-256 Sum     : {pkg.sha256sum}")
+    if _HAS_SHA256 and p.sha256sum:
+        fields.append(("SHA-256 Sum", p.sha256sum))
 
-    return "\n".join(lines)
+    return _format_fields(fields)
 
 
 def format_local_package(pkg) -> str:
@@ -449,80 +675,53 @@ def format_local_package(pkg) -> str:
     Returns:
         Formatted string in pacman -Qi format
     """
-    lines = []
-
-    lines.append(f"Name            : {pkg.name}")
-    lines.append(f"Version         : {pkg.version}")
-    lines.append(f"Description     : {pkg.desc if pkg.desc else 'None'}")
-    lines.append(f"Architecture    : {pkg.arch}")
-    lines.append(f"URL             : {pkg.url if pkg.url else 'None'}")
-    lines.append(
-        f"Licenses        : {' '.join(pkg.licenses) if pkg.licenses else 'None'}"
-    )
-    lines.append(f"Groups          : {' '.join(pkg.groups) if pkg.groups else 'None'}")
-    lines.append(
-        f"Provides        : {' '.join(pkg.provides) if pkg.provides else 'None'}"
-    )
-    lines.append(
-        f"Depends On      : {' '.join(pkg.depends) if pkg.depends else 'None'}"
-    )
-    lines.append(f"Optional Deps   : {format_optdeps(pkg.optdepends)}")
+    p = pkg
 
     # Required By - compute reverse dependencies
-    required_by = pkg.compute_requiredby() if hasattr(pkg, "compute_requiredby") else []
-    lines.append(
-        f"Required By     : {' '.join(required_by) if required_by else 'None'}"
-    )
+    required_by = p.compute_requiredby() if _HAS_REQUIREDBY else []
 
     # Optional For - compute optional reverse dependencies
-    optional_for = (
-        pkg.compute_optionalfor() if hasattr(pkg, "compute_optionalfor") else []
-    )
-    lines.append(
-        f"Optional For    : {' '.join(optional_for) if optional_for else 'None'}"
-    )
-
-    lines.append(
-        f"Conflicts With  : {' '.join(pkg.conflicts) if pkg.conflicts else 'None'}"
-    )
-    lines.append(
-        f"Replaces        : {' '.join(pkg.replaces) if pkg.replaces else 'None'}"
-    )
-    lines.append(f"Installed Size  : {format_size(pkg.isize)}")
-    lines.append(
-        f"Packager        : {pkg.packager if pkg.packager else 'Unknown Packager'}"
-    )
-    lines.append(f"Build Date      : {format_timestamp(pkg.builddate)}")
-    lines.append(f"Install Date    : {format_timestamp(pkg.installdate)}")
+    optional_for = p.compute_optionalfor() if _HAS_OPTIONALFOR else []
 
     # Install Reason
     reason_str = (
         "Explicitly installed"
-        if pkg.reason == pyalpm.PKG_REASON_EXPLICIT
+        if p.reason == pyalpm.PKG_REASON_EXPLICIT
         else "Installed as a dependency"
     )
-    lines.append(f"Install Reason  : {reason_str}")
 
     # Install Script
-    has_script = (
-        "Yes" if (hasattr(pkg, "has_scriptlet") and pkg.has_scriptlet) else "No"
-    )
-    lines.append(f"Install Script  : {has_script}")
+    has_script = "Yes" if (_HAS_SCRIPTLET and p.has_scriptlet) else "No"
 
     # Validated By
-    validation = []
-    if hasattr(pkg, "validation"):
-        if pkg.validation & pyalpm.PKG_VALIDATION_NONE:
-            validation.append("None")
-        if pkg.validation & pyalpm.PKG_VALIDATION_MD5SUM:
-            validation.append("MD5 Sum")
-        if pkg.validation & pyalpm.PKG_VALIDATION_SHA256SUM:
-            validation.append("SHA256 Sum")
-        if pkg.validation & pyalpm.PKG_VALIDATION_SIGNATURE:
-            validation.append("Signature")
-    lines.append(f"Validated By    : {' '.join(validation) if validation else 'None'}")
-
-    return "\n".join(lines)
+    v = p.validation
+    validation = [label for mask, label in _VALIDATION_FLAGS if v & mask]
+
+    return _format_fields(
+        [
+            ("Name", p.name),
+            ("Version", p.version),
+            ("Description", p.desc or "None"),
+            ("Architecture", p.arch),
+            ("URL", p.url or "None"),
+            ("Licenses", _join_or(p.licenses)),
+            ("Groups", _join_or(p.groups)),
+            ("Provides", _join_or(p.provides)),
+            ("Depends On", _join_or(p.depends)),
+            ("Optional Deps", format_optdeps(p.optdepends)),
+            ("Required By", _join_or(required_by)),
+            ("Optional For", _join_or(optional_for)),
+            ("Conflicts With", _join_or(p.conflicts)),
+            ("Replaces", _join_or(p.replaces)),
+            ("Installed Size", format_size(p.isize)),
+            ("Packager", p.packager or "Unknown Packager"),
+            ("Build Date", format_timestamp(p.builddate)),
+            ("Install Date", format_timestamp(p.installdate)),
+            ("Install Reason", reason_str),
+            ("Install Script", has_script),
+            ("Validated By", _join_or(validation)),
+        ]
+    )
 
 
 def get_package_info_formatted(pkgname: str) -> tuple:
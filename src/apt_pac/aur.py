@@ -1,20 +1,95 @@
+import atexit
+import base64
+import http.client
 import json
+import random
 import re
+import sqlite3
+import threading
 import time
-import urllib.request
 import urllib.parse
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import ExitStack
+from functools import lru_cache
+from itertools import chain
 from typing import List, Dict, Optional
 import subprocess
 import os
 import sys
 import shutil
 from pathlib import Path
-from . import ui
+import pyalpm
+from . import alpm_helper, ui
 from .ui import print_error, print_info, print_transaction_summary
 from .i18n import _
 from .config import get_config
 import tarfile
 
+try:
+    import orjson
+except ImportError:  # Optional: faster JSON for large RPC replies
+    orjson = None
+
+
+def _jloads(data):
+    """Decode JSON from bytes or str."""
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def _jdumps(obj) -> bytes:
+    """Encode an object as UTF-8 JSON bytes."""
+    if orjson is not None:
+        return orjson.dumps(obj)
+    text = json.dumps(obj, separators=(",", ":"), ensure_ascii=False)
+    return text.encode("utf-8")
+
+
+# Leading bytes of each compression pacman uses, mapped to a tarfile mode
+_PKG_MAGIC = (
+    (b"\x28\xb5\x2f\xfd", "zst"),
+    (b"\x1f\x8b", "r:gz"),
+    (b"\xfd7zXZ\x00", "r:xz"),
+    (b"BZh", "r:bz2"),
+)
+
+
+def _open_zst_tar(path: str, stack: ExitStack):
+    """
+    Open a zstd-compressed tar as a stream; stack closes it and its file.
+    Python 3.14+ reads zstd natively; older versions need 'zstandard'.
+    Returns None if no zstd decoder is available.
+    """
+    try:
+        return stack.enter_context(tarfile.open(path, "r:zst"))
+    except tarfile.CompressionError:
+        pass
+    try:
+        import zstandard
+    except ImportError:
+        return None
+    # tarfile never closes a fileobj it was handed, so the stack does
+    raw = stack.enter_context(open(path, "rb"))
+    decompressor = zstandard.ZstdDecompressor()
+    reader = stack.enter_context(decompressor.stream_reader(raw))
+    return stack.enter_context(tarfile.open(fileobj=reader, mode="r|"))
+
+
+def _bsdtar_has_pkginfo(path: str) -> Optional[bool]:
+    """Ask bsdtar (libarchive, a pacman dep) for .PKGINFO. None if absent."""
+    bsdtar = shutil.which("bsdtar")
+    if bsdtar is None:
+        return None
+    # -q stops at the first matching member; a missing member exits non-zero
+    res = subprocess.run(
+        [bsdtar, "-tqf", path, ".PKGINFO"],
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    )
+    return res.returncode == 0
+
 
 def is_valid_package(path: str) -> bool:
     """
@@ -25,27 +100,83 @@ def is_valid_package(path: str) -> bool:
         return False
 
     try:
-        # Optimistic check: tarfile.open handles transparent compression
-        # We look for .PKGINFO
-        with tarfile.open(path, "r:*") as tar:
-            for member in tar:
-                if member.name == ".PKGINFO":
+        with open(path, "rb") as f:
+            head = f.read(6)
+
+        # Sniff the compression instead of letting tarfile probe every codec
+        mode = "r:"
+        for magic, magic_mode in _PKG_MAGIC:
+            if head.startswith(magic):
+                mode = magic_mode
+                break
+
+        with ExitStack() as stack:
+            if mode == "zst":
+                tar = _open_zst_tar(path, stack)
+                if tar is None:
+                    found = _bsdtar_has_pkginfo(path)
+                    if found is None:
+                        # Nothing here can look inside; magic alone proves
+                        # nothing, so don't claim it is a package
+                        ui.console.print(
+                            f"[yellow]W:[/yellow] "
+                            f"{_('No zstd decoder available to inspect')} "
+                            f"{path}",
+                            highlight=False,
+                        )
+                        return False
+                    return found
+            else:
+                tar = stack.enter_context(tarfile.open(path, mode))
+
+            # makepkg stores the dot-files first, sorted (.BUILDINFO,
+            # .CHANGELOG, .INSTALL, .MTREE, .PKGINFO), so stop at the first
+            # regular payload entry instead of reading the whole archive
+            for member in iter(tar.next, None):
+                name = member.name.removeprefix("./")
+                if name == ".PKGINFO":
                     return True
+                if not name.startswith("."):
+                    break
             return False
     except (tarfile.TarError, OSError, Exception):
         return False
 
 
 class CyclicDependencyError(Exception):
-    """Raised when a circular dependency is detected in AUR packages."""
+    """Raised when circular dependencies are detected in AUR packages."""
+
+    def __init__(self, cycles: List[List[str]]):
+        if cycles and isinstance(cycles[0], str):
+            cycles = [cycles]  # Single cycle_path, as accepted before
+        self.cycles = cycles  # Each path starts and ends on the same package
+        self.cycle = cycles[0] if cycles else []  # First path, for old callers
+        cycle_str = "; ".join(" → ".join(path) for path in cycles)
+        if len(cycles) == 1:
+            super().__init__(f"Dependency cycle detected: {cycle_str}")
+        else:
+            super().__init__(f"Dependency cycles detected: {cycle_str}")
 
-    def __init__(self, cycle_path: List[str]):
-        self.cycle = cycle_path
-        cycle_str = " → ".join(cycle_path)
-        super().__init__(f"Dependency cycle detected: {cycle_str}")
+
+_DEP_SPLIT = re.compile(r"[<>=]")
+# Key id in the makepkg error for a source signed by an unknown key
+_PUBKEY_RE = re.compile(r"unknown public key ([0-9A-F]+)")
+# Built package file name: name-pkgver-pkgrel-arch.pkg.tar[.ext]; no .sig files
+_PKGFILE_RE = re.compile(r"^(.+)-[^-]+-[^-]+-[^-]+\.pkg\.tar(?:\.[a-z0-9]+)?$")
+# One "name version" line of `pacman --print-format "%n %v"`; version optional
+_PRINT_FORMAT_RE = re.compile(r"^[ \t]*(\S+)(?:[ \t]+(\S+))?.*$", re.M)
+# Byte budget for the package names of one pacman call, well below ARG_MAX
+MAX_ARGV = 100_000
+
+
+def _clean_dep(dep: str) -> str:
+    """Strip a version requirement from a dep ('python>=3.8' -> 'python')."""
+    m = _DEP_SPLIT.search(dep)
+    return (dep[: m.start()] if m else dep).strip()
 
 
 AUR_RPC_URL = "https://aur.archlinux.org/rpc/v5/"
+# Old JSON cache, superseded by CACHE_DB and deleted on first use of it
 CACHE_FILE = (
     Path(os.environ.get("XDG_CACHE_HOME", Path.home() / ".cache"))
     / "apt-pac"
@@ -53,49 +184,193 @@ CACHE_FILE = (
 )
 
 
-def _load_cache() -> Dict:
-    if not CACHE_FILE.exists():
-        return {}
-    try:
-        with open(CACHE_FILE, "r", encoding="utf-8") as f:
-            return json.load(f)
-    except Exception:
-        return {}
+CACHE_DB = CACHE_FILE.with_suffix(".sqlite")
 
+CACHE_MAX_ENTRIES = 10000
+# Seconds an empty reply (no such package, no search hits) stays cached, so a
+# package published since is picked up long before the regular TTL runs out
+CACHE_NEGATIVE_TTL = 120
+
+_cache_db = None  # Shared sqlite3 connection, opened on first use
+_cache_lock = threading.Lock()
+
+
+def _cache_conn() -> Optional[sqlite3.Connection]:
+    """Open (once) the RPC cache database. Returns None if unavailable."""
+    global _cache_db
+    if _cache_db is None:
+        with _cache_lock:
+            # Another thread (e.g. a check_updates worker) may have won
+            if _cache_db is None:
+                try:
+                    CACHE_DB.parent.mkdir(parents=True, exist_ok=True)
+                    conn = sqlite3.connect(CACHE_DB, check_same_thread=False)
+                    conn.execute("PRAGMA journal_mode=WAL")
+                    conn.execute("PRAGMA synchronous=NORMAL")
+                    conn.execute(
+                        "CREATE TABLE IF NOT EXISTS "
+                        "rpc(key TEXT PRIMARY KEY, ts REAL, data BLOB)"
+                    )
+                except (sqlite3.Error, OSError):
+                    return None
+                _cache_db = conn
+                atexit.register(_close_cache)
+                # The JSON cache this database replaced is never read again
+                try:
+                    CACHE_FILE.unlink(missing_ok=True)
+                except OSError:
+                    pass
+    return _cache_db
 
-def _save_cache(cache: Dict):
-    try:
-        CACHE_FILE.parent.mkdir(parents=True, exist_ok=True)
-        with open(CACHE_FILE, "w", encoding="utf-8") as f:
-            json.dump(cache, f)
-    except Exception:
-        pass
+
+def _close_cache():
+    """Close the cache connection; the last close checkpoints the WAL."""
+    global _cache_db
+    if _cache_db is not None:
+        try:
+            _cache_db.close()
+        except sqlite3.Error:
+            pass
+        _cache_db = None
 
 
 def _get_cached(key: str) -> Optional[List[Dict]]:
+    return _get_cached_many([key]).get(key)
+
+
+def _get_cached_many(keys: List[str]) -> Dict[str, List[Dict]]:
+    """Fresh cache entries for keys, as {key: data}; misses are left out."""
     config = get_config()
     # Default to 30 minutes if not set
     ttl_minutes = config.get("performance", "rpc_cache_ttl", 30)
     ttl_seconds = ttl_minutes * 60
 
-    cache = _load_cache()
-    if key in cache:
-        entry = cache[key]
-        if time.time() - entry.get("timestamp", 0) < ttl_seconds:
-            return entry.get("data")
-        else:
-            # Expired
-            del cache[key]
-            _save_cache(cache)
-    return None
+    conn = _cache_conn()
+    if conn is None or not keys:
+        return {}
+    found = {}
+    try:
+        with _cache_lock:
+            now = time.time()
+            expired = False
+            # Stay under SQLite's bound-parameter limit on older builds
+            for i in range(0, len(keys), 500):
+                chunk = keys[i : i + 500]
+                rows = conn.execute(
+                    "SELECT key, ts, data FROM rpc WHERE key IN (%s)"
+                    % ",".join("?" * len(chunk)),
+                    chunk,
+                ).fetchall()
+                for key, ts, data in rows:
+                    age = now - ts
+                    if age >= ttl_seconds:
+                        expired = True
+                        continue
+                    value = _jloads(data)
+                    if value or age < CACHE_NEGATIVE_TTL:
+                        found[key] = value
+            if expired:
+                # Sweep every stale row in one statement
+                with conn:
+                    conn.execute(
+                        "DELETE FROM rpc WHERE ts <= ?", (now - ttl_seconds,)
+                    )
+    except (sqlite3.Error, ValueError):
+        pass
+    return found
 
 
 def _set_cached(key: str, data: List[Dict]):
-    cache = _load_cache()
-    # Clean up old entries occasionally? For now just append/overwrite.
-    # Simple size limit check could be added here if needed.
-    cache[key] = {"timestamp": time.time(), "data": data}
-    _save_cache(cache)
+    _set_cached_many({key: data})
+
+
+def _set_cached_many(entries: Dict[str, List[Dict]]):
+    conn = _cache_conn()
+    if conn is None or not entries:
+        return
+    try:
+        with _cache_lock, conn:
+            now = time.time()
+            conn.executemany(
+                "INSERT OR REPLACE INTO rpc (key, ts, data) VALUES (?, ?, ?)",
+                [(key, now, _jdumps(data)) for key, data in entries.items()],
+            )
+            # Trim to the newest entries now and then, not on every write
+            if random.random() < 0.01:
+                max_entries = get_config().get(
+                    "performance", "rpc_cache_max_entries", CACHE_MAX_ENTRIES
+                )
+                conn.execute(
+                    "DELETE FROM rpc WHERE key NOT IN "
+                    "(SELECT key FROM rpc ORDER BY ts DESC LIMIT ?)",
+                    (max_entries,),
+                )
+    except sqlite3.Error:
+        pass
+
+
+_http = threading.local()  # One keep-alive HTTPS connection per thread
+
+
+def _rpc_connect(rpc: urllib.parse.SplitResult) -> http.client.HTTPSConnection:
+    """
+    Open an HTTPS connection to the RPC host. Honours https_proxy and
+    no_proxy like urllib does, tunnelling through the proxy with CONNECT.
+    """
+    proxy = urllib.request.getproxies().get("https")
+    if not proxy or urllib.request.proxy_bypass(rpc.hostname):
+        return http.client.HTTPSConnection(rpc.netloc, timeout=10)
+
+    if "://" not in proxy:
+        proxy = f"http://{proxy}"
+    proxy = urllib.parse.urlsplit(proxy)
+    headers = {}
+    if proxy.username is not None:
+        user = urllib.parse.unquote(proxy.username)
+        password = urllib.parse.unquote(proxy.password or "")
+        token = base64.b64encode(f"{user}:{password}".encode()).decode("ascii")
+        headers["Proxy-Authorization"] = f"Basic {token}"
+    conn = http.client.HTTPSConnection(
+        proxy.hostname, proxy.port or 80, timeout=10
+    )
+    conn.set_tunnel(rpc.netloc, headers=headers)
+    return conn
+
+
+def _rpc_get(path: str) -> Optional[Dict]:
+    """
+    GET an AUR RPC path (e.g. 'search/foo') and decode the JSON reply.
+    The connection is kept alive and reused by later calls from the same
+    thread, so only the first request pays for the TCP and TLS handshake.
+    Returns None on a non-200 status.
+    """
+    rpc = urllib.parse.urlsplit(AUR_RPC_URL)
+    for attempt in range(2):
+        conn = getattr(_http, "conn", None)
+        if conn is None:
+            conn = _rpc_connect(rpc)
+            _http.conn = conn
+        try:
+            # Add user agent strictly required by some APIs
+            conn.request(
+                "GET",
+                rpc.path + path,
+                headers={"User-Agent": "apt-pac/2026.01.01"},
+            )
+            response = conn.getresponse()
+            body = response.read()
+        except Exception as e:
+            conn.close()
+            _http.conn = None
+            # The server may drop an idle keep-alive connection; retry once
+            if attempt or not isinstance(e, ConnectionError):
+                raise
+            continue
+
+        if response.status != 200:
+            return None
+        return _jloads(body)
+    return None
 
 
 def search_aur(query: str) -> List[Dict]:
@@ -113,24 +388,15 @@ def search_aur(query: str) -> List[Dict]:
         if cached is not None:
             return cached
 
-        url = f"{AUR_RPC_URL}search/{safe_query}"
-
-        req = urllib.request.Request(url)
-        # Add user agent strictly required by some APIs
-        req.add_header("User-Agent", "apt-pac/2026.01.01")
+        data = _rpc_get(f"search/{safe_query}")
+        if data is None:
+            return []
 
-        with urllib.request.urlopen(req, timeout=10) as response:
-            if response.status != 200:
-                return []
-
-            data = json.loads(response.read().decode("utf-8"))
-
-            # v5 response structure: {"version":5, "type":"search", "resultcount": N, "results": [...]}
-            # v5 response structure: {"version":5, "type":"search", "resultcount": N, "results": [...]}
-            if data.get("type") == "search" and "results" in data:
-                results = data["results"]
-                _set_cached(cache_key, results)
-                return results
+        # v5 response structure: {"version":5, "type":"search", "resultcount": N, "results": [...]}
+        if data.get("type") == "search" and "results" in data:
+            results = data["results"]
+            _set_cached(cache_key, results)
+            return results
 
     except Exception:
         return []
@@ -141,71 +407,82 @@ def search_aur(query: str) -> List[Dict]:
 def get_aur_info(package_names: List[str]) -> List[Dict]:
     """
     Get detailed info for specific packages.
+    Replies are cached per package name, so names already looked up by an
+    earlier call (e.g. check_updates before an install) are not fetched
+    again, whatever batch they were requested in. Names the AUR does not
+    know are only remembered for CACHE_NEGATIVE_TTL seconds.
     """
     if not package_names:
         return []
 
-    # Max URI length is limited, so we might need to batch this if list is huge
-    # For now, simple implementation
-
-    params = [("v", "5"), ("type", "info")]
-    for p in package_names:
-        params.append(("arg[]", p))
-
-    query_string = urllib.parse.urlencode(params)
-
-    # Cache key based on sorted package names to ensure consistency
-    sorted_names = ",".join(sorted(package_names))
-    cache_key = f"info:{sorted_names}"
-
-    cached = _get_cached(cache_key)
-    if cached is not None:
-        return cached
+    # Dedups, keeps order
+    keys = {name: f"info:{name}" for name in package_names}
+    cached = _get_cached_many(list(keys.values()))
+    by_name = {name: cached[key] for name, key in keys.items() if key in cached}
+    missing = [name for name in keys if name not in by_name]
 
-    url = f"{AUR_RPC_URL}info?{query_string}"
+    if missing:
+        # Max URI length is limited; callers batch at most ~100 names
+        params = [("v", "5"), ("type", "info")]
+        for p in missing:
+            params.append(("arg[]", p))
 
-    try:
-        req = urllib.request.Request(url)
-        req.add_header("User-Agent", "apt-pac/2026.01.01")
-
-        with urllib.request.urlopen(req, timeout=10) as response:
-            if response.status != 200:
-                return []
-
-            data = json.loads(response.read().decode("utf-8"))
+        query_string = urllib.parse.urlencode(params)
 
-            if data.get("type") == "multiinfo" and "results" in data:
-                results = data["results"]
-                _set_cached(cache_key, results)
-                return results
-
-    except Exception:
-        return []
+        try:
+            data = _rpc_get(f"info?{query_string}")
+            if data and data.get("type") == "multiinfo" and "results" in data:
+                fetched = {name: [] for name in missing}  # [] = not in the AUR
+                # The RPC matches names case-insensitively ("Yay" finds
+                # "yay"), so file each reply under the name that was asked
+                # for. A reply matching no requested name answers nothing
+                # we asked and is dropped rather than duplicating a result.
+                folded = {name.lower(): name for name in missing}
+                for info in data["results"]:
+                    name = info["Name"]
+                    if name not in fetched:
+                        name = folded.get(name.lower())
+                    if name is not None:
+                        fetched[name].append(info)
+                _set_cached_many({f"info:{n}": v for n, v in fetched.items()})
+                by_name.update(fetched)
+        except Exception:
+            pass
 
-    return []
+    return [info for name in keys for info in by_name.get(name, ())]
 
 
 def is_installed(package: str) -> bool:
     """Check if a package is installed locally."""
-    from . import alpm_helper
-
     return alpm_helper.is_package_installed(package)
 
 
 def is_in_official_repos(package: str) -> bool:
     """Check if a package exists in official repos (or is provided by one)."""
-    from . import alpm_helper
-
     return alpm_helper.is_in_official_repos(package)
 
 
+def get_official_names() -> frozenset:
+    """Names of all official repo packages plus everything they provide."""
+    return alpm_helper.get_sync_pkg_names().union(
+        alpm_helper.get_repo_provides()
+    )
+
+
+def get_installed_names() -> frozenset:
+    """Names of all installed packages plus everything they provide."""
+    names = set()
+    for pkg in alpm_helper.get_installed_packages():
+        names.add(pkg.name)
+        names.update(prov.split("=", 1)[0] for prov in pkg.provides)
+    return frozenset(names)
+
+
 def get_installed_packages() -> Dict[str, str]:
     """
     Get all installed packages and their versions.
     Returns: Dict[package_name, version]
     """
-    from . import alpm_helper
-
     try:
         packages = {}
         for pkg in alpm_helper.get_installed_packages():
@@ -219,8 +496,6 @@ def get_installed_aur_packages() -> List[str]:
     """
     Get list of installed packages that are NOT in official repos (AUR packages).
     """
-    from . import alpm_helper
-
     try:
         packages = [
             pkg.name for pkg in alpm_helper.get_installed_packages(foreign_only=True)
@@ -232,11 +507,12 @@ def get_installed_aur_packages() -> List[str]:
 
 def version_compare(ver1: str, ver2: str) -> int:
     """
-    Compare two versions using pyalpm vercmp.
+    Compare two versions using pyalpm vercmp (libalpm's C rpmvercmp).
     Returns: <0 if ver1<ver2, 0 if equal, >0 if ver1>ver2
     """
-    import pyalpm
-
+    # Most foreign packages are up to date; skip the C call for those
+    if ver1 == ver2:
+        return 0
     return pyalpm.vercmp(ver1, ver2)
 
 
@@ -261,11 +537,25 @@ def check_updates(verbose=False) -> List[Dict]:
     # AUR RPC recommends max 100 args per request usually, but let's try batching chunks of 50
     updates = []
     chunk_size = 50
+    chunks = [
+        installed_aur[i : i + chunk_size]
+        for i in range(0, len(installed_aur), chunk_size)
+    ]
+
+    def fetch(chunk):
+        try:
+            return get_aur_info(chunk)
+        except Exception as e:
+            return e
+
+    # Fetch all chunks concurrently; results are consumed in chunk order
+    with ThreadPoolExecutor(max_workers=min(8, len(chunks))) as pool:
+        results = list(pool.map(fetch, chunks))
 
-    for i in range(0, len(installed_aur), chunk_size):
-        chunk = installed_aur[i : i + chunk_size]
+    for aur_info_list in results:
         try:
-            aur_info_list = get_aur_info(chunk)
+            if isinstance(aur_info_list, Exception):
+                raise aur_info_list
 
             for info in aur_info_list:
                 name = info["Name"]
@@ -281,6 +571,17 @@ def check_updates(verbose=False) -> List[Dict]:
     return updates
 
 
+@lru_cache(maxsize=None)
+def _detect_privilege_tool() -> str:
+    """Privilege tool for privilege_tool = auto, probed once per process."""
+    # Prioritize run0 if available (systemd v256+), then doas, then sudo
+    if shutil.which("run0"):
+        return "run0"
+    if shutil.which("doas"):
+        return "doas"
+    return "sudo"
+
+
 def get_privilege_command(target_user: str, cmd: List[str]) -> List[str]:
     """
     Wrap a command to run as a specific user using the configured tool.
@@ -291,14 +592,7 @@ def get_privilege_command(target_user: str, cmd: List[str]) -> List[str]:
 
     # Auto-detect if auto
     if tool == "auto":
-        # Check what's available
-        # Prioritize run0 if available (systemd v256+), then doas, then sudo
-        if shutil.which("run0"):
-            tool = "run0"
-        elif shutil.which("doas"):
-            tool = "doas"
-        else:
-            tool = "sudo"
+        tool = _detect_privilege_tool()
 
     if tool == "run0":
         return ["run0", f"--user={target_user}"] + cmd
@@ -309,6 +603,42 @@ def get_privilege_command(target_user: str, cmd: List[str]) -> List[str]:
         return ["sudo", "-u", target_user] + cmd
 
 
+_GIT = shutil.which("git")  # Resolved once instead of a PATH search per spawn
+_PACMAN = shutil.which("pacman")
+
+
+def _run_git(cmd: List[str], **kwargs) -> subprocess.CompletedProcess:
+    """
+    Run a git command. Our fds are non-inheritable (PEP 446), so
+    close_fds=False is safe and lets Python spawn without walking every
+    open fd of the child. With an absolute executable and no cwd, this
+    also lets CPython use posix_spawn() instead of fork+exec.
+    """
+    return subprocess.run(cmd, executable=_GIT, close_fds=False, **kwargs)
+
+
+def _git_clone_cmd(clone_url: str, target_dir: Path) -> List[str]:
+    # Only the tip is needed to build; skip the history and tags
+    return [
+        "git",
+        "clone",
+        "--depth=1",
+        "--single-branch",
+        "--no-tags",
+        clone_url,
+        str(target_dir),
+    ]
+
+
+def _git_update_cmds(target_dir: Path) -> List[List[str]]:
+    # Update a shallow clone in place, keeping it shallow (AUR repos use master)
+    git = ["git", "-C", str(target_dir)]
+    return [
+        git + ["fetch", "--depth=1", "origin", "master"],
+        git + ["reset", "--hard", "origin/master"],
+    ]
+
+
 def download_aur_source(
     package_name: str, target_dir: Optional[Path] = None, force=False
 ) -> Optional[Path]:
@@ -328,7 +658,8 @@ def download_aur_source(
         elif (target_dir / ".git").exists():
             # Already exists and is a git repo, just pull
             try:
-                subprocess.run(["git", "pull"], cwd=target_dir, check=True)
+                for cmd in _git_update_cmds(target_dir):
+                    _run_git(cmd, check=True)
                 return target_dir
             except subprocess.CalledProcessError:
                 # If pull fails, remove and re-clone
@@ -347,7 +678,7 @@ def download_aur_source(
     target_dir.parent.mkdir(parents=True, exist_ok=True)
     try:
         # Show git clone output so users can see progress/errors
-        subprocess.run(["git", "clone", clone_url, str(target_dir)], check=True)
+        _run_git(_git_clone_cmd(clone_url, target_dir), check=True)
         return target_dir
     except subprocess.CalledProcessError:
         print_error(_(f"Failed to clone {package_name} from AUR"))
@@ -356,57 +687,139 @@ def download_aur_source(
 
 class AurResolver:
     def __init__(self):
-        self.visiting = set()  # Currently visiting (gray nodes for cycle detection)
+        self.visiting = set()  # On the SCC stack (component not closed yet)
         self.visited = set()  # Fully processed (black nodes)
+        self.index = {}  # AUR package → DFS discovery index (Tarjan)
+        self.lowlink = {}  # AUR package → lowest index reachable (Tarjan)
+        self.scc_stack = []  # Packages whose component is still open
+        self.cycles = []  # One cycle path per non-trivial component
         self.queue = []  # Topological sort result
+        self.queued_bases = set()  # PackageBases already in self.queue
+        self.clean_deps_by_name = {}  # Package name → deps, versions stripped
         self.aur_info_cache = {}
         self.official_deps = set()
         self.package_bases = {}  # PackageBase → set of package names (for split packages)
         self.base_to_info = {}  # PackageBase → representative package info
+        self.installed_names = frozenset()  # Installed names and provides
+        self.official_names = frozenset()  # Official names and provides
 
     def resolve(self, packages: List[str]) -> List[Dict]:
         """
         Resolve dependencies for a list of packages.
         Returns a list of package info dicts in build order.
         """
+        # One pass over the local and sync DBs instead of a query per package
+        self.installed_names = get_installed_names()
+        self.official_names = get_official_names()
+
+        self._prefetch(packages)
         for pkg in packages:
             # Force visit explicitly requested packages even if installed
             self._visit(pkg, force_visit=True)
+        if self.cycles:
+            raise CyclicDependencyError(self.cycles)
         return self.queue
 
-    def _visit(self, pkg_name: str, force_visit=False, path=None):
-        if path is None:
-            path = []
+    @staticmethod
+    def _dep_names(pkg_info: Dict) -> List[str]:
+        """Names of all build and runtime deps, version requirements dropped."""
+        deps = chain(
+            pkg_info.get("Depends") or (),
+            pkg_info.get("MakeDepends") or (),
+            pkg_info.get("CheckDepends") or (),
+        )
+        return [_clean_dep(d) for d in deps]
+
+    def _prefetch(self, packages: List[str]):
+        """
+        Fetch AUR info for the whole dependency tree before sorting it.
+        Walks the tree level by level so each level costs one RPC call
+        (per 100 names) instead of one call per package.
+        """
+        explicit = set(packages)
+        frontier = list(dict.fromkeys(packages))
+        seen = set(frontier)
+
+        while frontier:
+            wanted = []
+            for name in frontier:
+                if name in self.installed_names and name not in explicit:
+                    continue
+                if name in self.official_names:
+                    continue
+                wanted.append(name)
+
+            next_frontier = []
+            for i in range(0, len(wanted), 100):
+                for info in get_aur_info(wanted[i : i + 100]):
+                    self.aur_info_cache[info["Name"]] = info
+                    deps = self._dep_names(info)
+                    self.clean_deps_by_name[info["Name"]] = deps
+                    for dep in deps:
+                        if dep not in seen:
+                            seen.add(dep)
+                            next_frontier.append(dep)
+            frontier = next_frontier
+
+    def _visit(self, pkg_name: str, force_visit=False):
+        """
+        Tarjan's strongly connected components walk from pkg_name, using an
+        explicit stack of (name, remaining deps) instead of recursion.
+        Acyclic packages close in post-order and are queued as they close,
+        which is a valid build order. Every dependency cycle is recorded in
+        self.cycles rather than aborting on the first one.
+        """
+        if pkg_name in self.index or not self._enter(pkg_name, force_visit):
+            return
 
-        # Cycle detection: if we encounter a package we're currently visiting, it's a cycle
-        if pkg_name in self.visiting:
-            cycle_path = path + [pkg_name]
-            raise CyclicDependencyError(cycle_path)
+        stack = [(pkg_name, iter(self.clean_deps_by_name[pkg_name]))]
+        while stack:
+            name, deps = stack[-1]
+            dep = next(deps, None)
+            if dep is not None:
+                if dep in self.index:
+                    if dep in self.visiting:
+                        # Edge back into an open component
+                        self.lowlink[name] = min(
+                            self.lowlink[name], self.index[dep]
+                        )
+                elif self._enter(dep, False):
+                    stack.append((dep, iter(self.clean_deps_by_name[dep])))
+                continue
+
+            # All deps done
+            stack.pop()
+            if stack:
+                parent = stack[-1][0]
+                self.lowlink[parent] = min(
+                    self.lowlink[parent], self.lowlink[name]
+                )
+            if self.lowlink[name] == self.index[name]:
+                self._close_component(name)
 
+    def _enter(self, pkg_name: str, force_visit: bool) -> bool:
+        """Open pkg_name on the SCC stack. False if it needs no expansion."""
         # If already fully processed, skip
         if pkg_name in self.visited:
-            return
+            return False
 
         # If installed and not forced (explicitly requested), skip
-        if not force_visit and is_installed(pkg_name):
+        if not force_visit and pkg_name in self.installed_names:
             self.visited.add(pkg_name)
-            return
+            return False
 
         # Check if official (ignore if so, makepkg handles it)
-        if is_in_official_repos(pkg_name):
+        if pkg_name in self.official_names:
             self.official_deps.add(pkg_name)
             self.visited.add(pkg_name)
-            return
+            return False
 
-        # Fetch info from AUR
+        # AUR info was fetched by _prefetch; anything missing doesn't exist
         if pkg_name not in self.aur_info_cache:
-            info = get_aur_info([pkg_name])
-            if not info:
-                print_error(
-                    _(f"Package '{pkg_name}' not found in AUR or official repos.")
-                )
-                sys.exit(1)
-            self.aur_info_cache[pkg_name] = info[0]
+            print_error(
+                _(f"Package '{pkg_name}' not found in AUR or official repos.")
+            )
+            sys.exit(1)
 
         pkg_info = self.aur_info_cache[pkg_name]
         base = pkg_info.get("PackageBase", pkg_name)
@@ -417,35 +830,73 @@ class AurResolver:
             self.base_to_info[base] = pkg_info
         self.package_bases[base].add(pkg_name)
 
-        # Mark as visiting (gray node)
+        self.index[pkg_name] = self.lowlink[pkg_name] = len(self.index)
+        self.scc_stack.append(pkg_name)
         self.visiting.add(pkg_name)
-
-        # Dependencies
-        deps = (
-            pkg_info.get("Depends", [])
-            + pkg_info.get("MakeDepends", [])
-            + pkg_info.get("CheckDepends", [])
-        )
-
-        # Strip version requirements (e.g. 'python>=3.8' -> 'python')
-        clean_deps = []
-        for d in deps:
-            # Handle headers like 'depend>=1.0'
-            clean_name = d.split(">")[0].split("<")[0].split("=")[0].strip()
-            clean_deps.append(clean_name)
-
-        # Recurse
-        for dep in clean_deps:
-            self._visit(dep, force_visit=False, path=path + [pkg_name])
-
-        # Mark as visited (black node) and remove from visiting
-        self.visiting.remove(pkg_name)
-        self.visited.add(pkg_name)
+        return True
+
+    def _close_component(self, root: str):
+        """Pop the component rooted at root; queue it or record its cycle."""
+        component = []
+        while True:
+            member = self.scc_stack.pop()
+            self.visiting.remove(member)
+            self.visited.add(member)
+            component.append(member)
+            if member == root:
+                break
+
+        if len(component) > 1 or root in self.clean_deps_by_name[root]:
+            self.cycles.append(self._cycle_path(root, set(component)))
+            return
 
         # Add to queue (Post-order), but only once per PackageBase
-        if base not in [p.get("PackageBase", p["Name"]) for p in self.queue]:
+        base = self.aur_info_cache[root].get("PackageBase", root)
+        if base not in self.queued_bases:
+            self.queued_bases.add(base)
             self.queue.append(self.base_to_info[base])
 
+    def _cycle_path(self, start: str, members: set) -> List[str]:
+        """A concrete cycle (first == last) through a strongly connected set."""
+        # Every member has a dep inside the component, so this walk must loop
+        path = [start]
+        position = {start: 0}
+        while True:
+            deps = self.clean_deps_by_name[path[-1]]
+            nxt = next(d for d in deps if d in members)
+            if nxt in position:
+                return path[position[nxt] :] + [nxt]
+            position[nxt] = len(path)
+            path.append(nxt)
+
+
+def _find_pkgs(
+    pkg_dir: Path, name: Optional[str] = None, signatures: bool = False
+) -> List[Path]:
+    """
+    Package files (name-ver-rel-arch.pkg.tar.*) in pkg_dir, from one directory
+    scan. If name is given, -debug packages built alongside it are skipped
+    unless name itself is the debug package. With signatures, detached
+    package signatures (*.pkg.tar.*.sig) are included as well.
+    """
+    found = []
+    try:
+        with os.scandir(pkg_dir) as it:
+            for entry in it:
+                fname = entry.name
+                if signatures:
+                    fname = fname.removesuffix(".sig")
+                m = _PKGFILE_RE.match(fname)
+                if not m or not entry.is_file(follow_symlinks=False):
+                    continue
+                pkgname = m.group(1)
+                if name and pkgname != name and pkgname.endswith("-debug"):
+                    continue
+                found.append(Path(entry.path))
+    except FileNotFoundError:
+        pass
+    return found
+
 
 class AurInstaller:
     def __init__(self):
@@ -475,10 +926,13 @@ class AurInstaller:
         else:
             self.build_dir = self.config.cache_dir / "sources" / "aur"
 
-        if not self.build_dir.exists():
-            self.build_dir.mkdir(parents=True, exist_ok=True)
+        self.build_dir.mkdir(parents=True, exist_ok=True)
 
         self.resolver = None
+        # Sources already downloaded by _fetch_sources
+        self.fetched_bases = set()
+        # Source dirs already handed to the build user
+        self.chowned_bases = set()
 
     def install(
         self,
@@ -503,8 +957,10 @@ class AurInstaller:
                     ui.console.print(
                         f"  2. {_('Try installing packages individually')}"
                     )
+                    names = dict.fromkeys(n for c in e.cycles for n in c)
                     ui.console.print(
-                        f"  3. {_('Report this to')} AUR {_('maintainers:')} {', '.join(set(e.cycle))}"
+                        f"  3. {_('Report this to')} AUR {_('maintainers:')} "
+                        f"{', '.join(names)}"
                     )
                     sys.exit(1)
             official_deps = resolver.official_deps
@@ -591,6 +1047,11 @@ class AurInstaller:
         # If yes -> install immediately (--asdeps)
         # If no -> add to final_batch list
 
+        # Download every source up front (in parallel) unless verbose,
+        # where git output is shown and must not interleave
+        if not verbose:
+            self._fetch_sources(build_queue)
+
         final_batch_paths = []
         final_batch_names = []
 
@@ -599,32 +1060,27 @@ class AurInstaller:
         # We need to check dependencies of *remaining* items.
 
         # Pre-process dependencies of the queue to make lookups fast
+        # The resolver already parsed them; only an external queue needs parsing
+        known_deps = self.resolver.clean_deps_by_name if self.resolver else {}
         queue_deps = {}  # pkg_name -> set(deps)
-        for i, pkg in enumerate(build_queue):
+        for pkg in build_queue:
             pname = pkg["Name"]
-            deps = set()
-            deps.update(pkg.get("Depends", []))
-            deps.update(pkg.get("MakeDepends", []))
-            deps.update(pkg.get("CheckDepends", []))
-
-            # Clean version constraints
-            clean_deps = set()
-            for d in deps:
-                clean = d.split(">")[0].split("<")[0].split("=")[0].strip()
-                clean_deps.add(clean)
-            queue_deps[pname] = clean_deps
+            deps = known_deps.get(pname)
+            if deps is None:
+                deps = AurResolver._dep_names(pkg)
+            queue_deps[pname] = set(deps)
+
+        # Reverse index: dep name -> position of the LAST queue entry needing it
+        last_consumer = {}
+        for j, pkg in enumerate(build_queue):
+            for d in queue_deps[pkg["Name"]]:
+                last_consumer[d] = j
 
         for i, pkg in enumerate(build_queue):
             pkg_name = pkg["Name"]
 
             # Determine if this package is needed by any FUTURE package in the queue
-            needed_by_future = False
-            for j in range(i + 1, len(build_queue)):
-                future_pkg = build_queue[j]
-                future_name = future_pkg["Name"]
-                if pkg_name in queue_deps[future_name]:
-                    needed_by_future = True
-                    break
+            needed_by_future = last_consumer.get(pkg_name, -1) > i
 
             # Build the package
             # This returns the list of built package files valid for this package
@@ -662,7 +1118,7 @@ class AurInstaller:
                     f"[dim]{_('Installing intermediate dependency')} {pkg_name}...[/dim]"
                 )
                 cmd = ["pacman", "-U", "--noconfirm", "--asdeps"] + [
-                    str(f) for f in built_files
+                    os.fspath(f) for f in built_files
                 ]
 
                 # We use simple subprocess here to avoid noise, or use our wrapper?
@@ -698,7 +1154,7 @@ class AurInstaller:
                     highlight=False,
                 )
 
-            cmd = ["pacman", "-U"] + [str(f) for f in final_batch_paths]
+            cmd = ["pacman", "-U"] + [os.fspath(f) for f in final_batch_paths]
             if auto_confirm:
                 cmd.append("--noconfirm")
             else:
@@ -725,18 +1181,19 @@ class AurInstaller:
         name = pkg_info["Name"]
         pkg_dir = self.build_dir / base
 
-        # Print GET line for source download with proper formatting
-        # Format: Get:N https://aur.archlinux.org/pkgname.git pkgname-source
-        ui.console.print(
-            f"[bold cyan]Get:[/bold cyan]1 [blue]https://aur.archlinux.org/{base}.git[/blue] {base}-source",
-            highlight=False,
-        )
+        if base not in self.fetched_bases:
+            # Print GET line for source download with proper formatting
+            # Format: Get:N https://aur.archlinux.org/pkgname.git pkgname-source
+            ui.console.print(
+                f"[bold cyan]Get:[/bold cyan]1 [blue]https://aur.archlinux.org/{base}.git[/blue] {base}-source",
+                highlight=False,
+            )
 
-        # 1. Clone or Pull (using PackageBase)
-        # We capture output to hide it unless verbose
-        if not self._download_source_silent(base, pkg_dir, verbose):
-            print_error(_(f"Failed to download source for {base}"))
-            sys.exit(1)
+            # 1. Clone or Pull (using PackageBase)
+            # We capture output to hide it unless verbose
+            if not self._download_source_silent(base, pkg_dir, verbose):
+                print_error(_(f"Failed to download source for {base}"))
+                sys.exit(1)
 
         # Fix permissions
         config = get_config()
@@ -746,10 +1203,16 @@ class AurInstaller:
         else:
             real_user = build_user_config
 
-        if os.getuid() == 0 and real_user:
+        if os.getuid() == 0 and real_user and base not in self.chowned_bases:
+            # Only this base's sources need handing over, not the whole cache
+            try:
+                shutil.chown(self.build_dir, user=real_user)
+            except (OSError, LookupError):
+                pass
             subprocess.run(
-                ["chown", "-R", f"{real_user}:", str(self.build_dir)], check=False
+                ["chown", "-R", f"{real_user}:", str(pkg_dir)], check=False
             )
+            self.chowned_bases.add(base)
 
         # 2. Build
         # makepkg -f (force rebuild), --needed (skip if existing?)
@@ -769,12 +1232,7 @@ class AurInstaller:
                 tool = config.get("tools", "privilege_tool", "auto")
 
                 if tool == "auto":
-                    if shutil.which("run0"):
-                        tool = "run0"
-                    elif shutil.which("doas"):
-                        tool = "doas"
-                    else:
-                        tool = "sudo"
+                    tool = _detect_privilege_tool()
 
                 makepkg_cmd_str = " ".join(cmd)
                 shell_cmd = f"cd {pkg_dir} && {makepkg_cmd_str}"
@@ -794,8 +1252,8 @@ class AurInstaller:
             run_cwd = pkg_dir
 
         try:
-            # Clean previous packages to avoid confusion
-            for existing_pkg in pkg_dir.glob("*.pkg.tar.*"):
+            # Clean previous packages and their signatures to avoid confusion
+            for existing_pkg in _find_pkgs(pkg_dir, signatures=True):
                 try:
                     existing_pkg.unlink()
                 except OSError:
@@ -803,29 +1261,8 @@ class AurInstaller:
 
             subprocess.run(cmd, cwd=run_cwd, check=True)
 
-            # 3. Find built packages
-            # FILTER logic: Only return packages that match the requested 'name'
-            # OR are part of the 'provides' if split?
-            # Actually, we need to match what we expect.
-            # If 'name' is 'pix', we want 'pix-*.pkg.tar.*'.
-            # We do NOT want 'pix-debug-*.pkg.tar.*' unless name was 'pix-debug'.
-
-            all_pkg_files = list(pkg_dir.glob("*.pkg.tar.*"))
-            valid_pkg_files = []
-
-            for f in all_pkg_files:
-                # heuristic: check if filename starts with name-
-                # Or check metadata?
-                # Simple check:
-                fname = f.name
-
-                # Check for debug package
-                if "-debug" in fname and not name.endswith("-debug"):
-                    continue
-
-                valid_pkg_files.append(f)
-
-            return valid_pkg_files
+            # 3. Find built packages (skipping unrequested -debug splits)
+            return _find_pkgs(pkg_dir, name)
 
         except subprocess.CalledProcessError as e:
             # Check for GPG error
@@ -835,7 +1272,7 @@ class AurInstaller:
             if not output and e.stdout:
                 output = e.stdout.decode("utf-8", errors="ignore")
 
-            gpg_match = re.search(r"unknown public key ([0-9A-F]+)", output)
+            gpg_match = _PUBKEY_RE.search(output)
             if gpg_match:
                 key_id = gpg_match.group(1)
                 ui.console.print(
@@ -849,21 +1286,8 @@ class AurInstaller:
                     ui.console.print(_("Key imported. Retrying build..."))
                     subprocess.run(cmd, cwd=run_cwd, check=True)
 
-                    # If we get here, it succeeded on retry
-                    # Need to duplicate the success logic (find packages)
-                    # Ideally we loop or recurse, but recursion is risky.
-                    # Copy-paste finding logic for now or refactor?
-                    # Refactoring _build_pkg is better but let's just do find logic.
-
-                    # 3. Find built packages (Copy from above)
-                    all_pkg_files = list(pkg_dir.glob("*.pkg.tar.*"))
-                    valid_pkg_files = []
-                    for f in all_pkg_files:
-                        fname = f.name
-                        if "-debug" in fname and not name.endswith("-debug"):
-                            continue
-                        valid_pkg_files.append(f)
-                    return valid_pkg_files
+                    # Succeeded on retry: same lookup as above
+                    return _find_pkgs(pkg_dir, name)
 
                 except subprocess.CalledProcessError:
                     print_error(_(f"Failed to import key {key_id} or rebuild failed."))
@@ -872,6 +1296,40 @@ class AurInstaller:
             print_error(_(f"Failed to build {name}"))
             sys.exit(1)
 
+    def _fetch_sources(self, build_queue: List[Dict]):
+        """
+        Clone or update the sources of every queued PackageBase at once.
+        Downloads are network-bound, so they run on a thread pool; the
+        Get: lines are printed in queue order as results come in.
+        """
+        bases = list(
+            dict.fromkeys(
+                p.get("PackageBase", p["Name"])
+                for p in build_queue
+                if p.get("PackageBase", p["Name"]) not in self.fetched_bases
+            )
+        )
+        if not bases:
+            return
+
+        def fetch(base):
+            target_dir = self.build_dir / base
+            return self._download_source_silent(base, target_dir, False)
+
+        with ThreadPoolExecutor(max_workers=min(8, len(bases))) as pool:
+            results = zip(bases, pool.map(fetch, bases))
+            for n, (base, ok) in enumerate(results, 1):
+                ui.console.print(
+                    f"[bold cyan]Get:[/bold cyan]{n} "
+                    f"[blue]https://aur.archlinux.org/{base}.git[/blue] "
+                    f"{base}-source",
+                    highlight=False,
+                )
+                if not ok:
+                    print_error(_(f"Failed to download source for {base}"))
+                    sys.exit(1)
+                self.fetched_bases.add(base)
+
     def _download_source_silent(self, package_name, target_dir, verbose):
         # Wrapper to reuse download_aur_source but suppress output
         # Since currently download_aur_source prints directly, we might need to modify it or
@@ -895,27 +1353,59 @@ class AurInstaller:
 
         if target_dir.exists():
             if (target_dir / ".git").exists():
-                cmd = ["git", "pull"]
-                cwd = target_dir
+                cmds = _git_update_cmds(target_dir)
             else:
                 shutil.rmtree(target_dir)
                 target_dir.parent.mkdir(parents=True, exist_ok=True)
-                cmd = ["git", "clone", clone_url, str(target_dir)]
-                cwd = None
+                cmds = [_git_clone_cmd(clone_url, target_dir)]
         else:
             target_dir.parent.mkdir(parents=True, exist_ok=True)
-            cmd = ["git", "clone", clone_url, str(target_dir)]
-            cwd = None
+            cmds = [_git_clone_cmd(clone_url, target_dir)]
 
         try:
-            # Capture output unless verbose
-            capture = not verbose
-            subprocess.run(cmd, cwd=cwd, check=True, capture_output=capture)
+            # Discard output unless verbose; nothing reads it back
+            quiet = None if verbose else subprocess.DEVNULL
+            for cmd in cmds:
+                _run_git(cmd, check=True, stdout=quiet, stderr=quiet)
             return True
         except subprocess.CalledProcessError:
             return False
 
 
+def _argv_chunks(names: List[str], limit: int) -> List[List[str]]:
+    """Greedily pack names into lists whose argv size stays under limit."""
+    chunks, chunk, size = [], [], 0
+    for name in names:
+        n = len(name.encode()) + 1  # NUL terminator
+        if chunk and size + n > limit:
+            chunks.append(chunk)
+            chunk, size = [], 0
+        chunk.append(name)
+        size += n
+    if chunk:
+        chunks.append(chunk)
+    return chunks
+
+
+def _print_versions(names: List[str]) -> List[tuple]:
+    """(name, version) pairs via `pacman -S --print`; '' if unknown."""
+    try:
+        cmd = ["pacman", "-S", "--print", "--print-format", "%n %v"] + names
+        # Same posix_spawn-friendly arguments as _run_git
+        res = subprocess.run(
+            cmd,
+            executable=_PACMAN,
+            close_fds=False,
+            capture_output=True,
+            text=True,
+        )
+        if res.returncode == 0:
+            return _PRINT_FORMAT_RE.findall(res.stdout)
+    except Exception:
+        pass
+    return [(dep, "") for dep in names]
+
+
 def get_resolved_package_info(
     build_queue: List[Dict], official_deps: set
 ) -> List[tuple]:
@@ -932,24 +1422,14 @@ def get_resolved_package_info(
 
     # Add Official deps
     if official_deps:
-        # run pacman -S --print to get versions
-        try:
-            cmd = ["pacman", "-S", "--print", "--print-format", "%n %v"] + list(
-                official_deps
-            )
-            res = subprocess.run(cmd, capture_output=True, text=True)
-            if res.returncode == 0:
-                for line in res.stdout.splitlines():
-                    parts = line.split()
-                    if len(parts) >= 2:
-                        install_info.append((parts[0], parts[1]))
-                    else:
-                        install_info.append((line.strip(), ""))
-            else:
-                for dep in official_deps:
-                    install_info.append((dep, ""))
-        except Exception:
-            for dep in official_deps:
-                install_info.append((dep, ""))
+        # run pacman -S --print to get versions, split so no argv hits E2BIG
+        chunks = _argv_chunks(sorted(official_deps), MAX_ARGV)
+        # Chunks can share transitive deps; list each name once (first wins)
+        versions = {}
+        with ThreadPoolExecutor(max_workers=min(4, len(chunks))) as pool:
+            for result in pool.map(_print_versions, chunks):
+                for dep, ver in result:
+                    versions.setdefault(dep, ver)
+        install_info.extend(versions.items())
 
     return install_info
@@ -3,6 +3,31 @@ import sys
 import subprocess
 
 
+def _pacman_version():
+    """
+    Version lines of the installed pacman, or None if it can't be run.
+    Only called for the --version variants that print it, so plain
+    --version doesn't spawn pacman.
+    """
+    try:
+        result = subprocess.run(
+            ["pacman", "--version"], capture_output=True, text=True
+        )
+        if result.returncode == 0:
+            # Extract version from first line (format: " .--.                  Pacman v6.0.1 - libalpm v13.0.1")
+            first_line = result.stdout.strip().split("\n")[0]
+            # Filter out ASCII art
+            if "Pacman v" in first_line:
+                start_idx = first_line.find("Pacman v")
+                clean_line = first_line[start_idx:]
+                # Split into lines (Pacman vX - libalpm vY -> Pacman vX\nlibalpm vY)
+                return clean_line.replace(" - ", "\n")
+            return first_line
+    except Exception:
+        return "unknown"
+    return None
+
+
 def parse_args():
     from . import __version__
     from .i18n import _
@@ -24,26 +49,6 @@ def parse_args():
     args = parser.parse_args()
 
     if args.version is not None:
-        # Get pacman version
-        pacman_version = None
-        try:
-            result = subprocess.run(
-                ["pacman", "--version"], capture_output=True, text=True
-            )
-            if result.returncode == 0:
-                # Extract version from first line (format: " .--.                  Pacman v6.0.1 - libalpm v13.0.1")
-                first_line = result.stdout.strip().split("\n")[0]
-                # Filter out ASCII art
-                if "Pacman v" in first_line:
-                    start_idx = first_line.find("Pacman v")
-                    clean_line = first_line[start_idx:]
-                    # Split into lines (Pacman vX - libalpm vY -> Pacman vX\nlibalpm vY)
-                    pacman_version = clean_line.replace(" - ", "\n")
-                else:
-                    pacman_version = first_line
-        except Exception:
-            pacman_version = "unknown"
-
         # Handle different version options
         if args.version == "default":
             # Just --version (default behavior)
@@ -51,10 +56,10 @@ def parse_args():
         elif args.version == "full":
             # --version full (show both)
             print(f"apt-pac {__version__} (All)")
-            print(pacman_version if pacman_version else "pacman: unknown")
+            print(_pacman_version() or "pacman: unknown")
         elif args.version == "pacman":
             # --version pacman (only pacman)
-            print(pacman_version if pacman_version else "pacman: unknown")
+            print(_pacman_version() or "pacman: unknown")
         else:
             # Unknown option
             print(f"apt-pac {__version__}")
@@ -680,7 +680,10 @@ def get_editor():
     for cmd in ["nano", "vi"]:
         if (
             subprocess.run(
-                ["command", "-v", cmd], shell=True, capture_output=True
+                ["command", "-v", cmd],
+                shell=True,
+                stdout=subprocess.DEVNULL,
+                stderr=subprocess.DEVNULL,
             ).returncode
             == 0
         ):
@@ -883,6 +886,9 @@ def sync_databases(cmd=None):
             print_error(_("Failed to synchronize databases"))
             sys.exit(1)
 
+        # Sync DBs changed on disk; drop cached handle and package indexes
+        alpm_helper.refresh()
+
     except subprocess.CalledProcessError:
         print_error(_("Failed to run pacman"))
         sys.exit(1)
@@ -1712,10 +1718,14 @@ def execute_command(apt_cmd, extra_args):
                 except Exception:
                     pass
 
+            sync_pkgs = alpm_helper.get_packages(
+                pkg.name for pkg in installed_pkgs
+            )
+
             for pkg in sorted(installed_pkgs, key=lambda p: p.name):
                 # Find real repository by looking up in sync databases
                 repo = "local"
-                sync_pkg = alpm_helper.get_package(pkg.name)
+                sync_pkg = sync_pkgs.get(pkg.name)
                 if sync_pkg:
                     repo = sync_pkg.db.name
 
@@ -1759,10 +1769,14 @@ def execute_command(apt_cmd, extra_args):
             # Use native pyalpm for manual/explicit packages
             explicit_pkgs = alpm_helper.get_installed_packages(explicit_only=True)
 
+            sync_pkgs = alpm_helper.get_packages(
+                pkg.name for pkg in explicit_pkgs
+            )
+
             for pkg in sorted(explicit_pkgs, key=lambda p: p.name):
                 # Find real repository
                 repo = "local"
-                sync_pkg = alpm_helper.get_package(pkg.name)
+                sync_pkg = sync_pkgs.get(pkg.name)
                 if sync_pkg:
                     repo = sync_pkg.db.name
 
@@ -1805,7 +1819,10 @@ def execute_command(apt_cmd, extra_args):
             if repo:
                 if (
                     subprocess.run(
-                        ["command -v paclist"], shell=True, capture_output=True
+                        ["command -v paclist"],
+                        shell=True,
+                        stdout=subprocess.DEVNULL,
+                        stderr=subprocess.DEVNULL,
                     ).returncode
                     == 0
                 ):
@@ -1835,9 +1852,13 @@ def execute_command(apt_cmd, extra_args):
                             break
                 installed_pkgs = filtered
 
+            sync_pkgs = alpm_helper.get_packages(
+                pkg.name for pkg in installed_pkgs
+            )
+
             for pkg in sorted(installed_pkgs, key=lambda p: p.name):
                 # Find real repository
-                sync_pkg = alpm_helper.get_package(pkg.name)
+                sync_pkg = sync_pkgs.get(pkg.name)
                 repo = sync_pkg.db.name if sync_pkg else "local"
 
                 # Architecture
@@ -1959,7 +1980,10 @@ def execute_command(apt_cmd, extra_args):
     elif apt_cmd == "scripts":
         if (
             subprocess.run(
-                ["command -v pacscripts"], shell=True, capture_output=True
+                ["command -v pacscripts"],
+                shell=True,
+                stdout=subprocess.DEVNULL,
+                stderr=subprocess.DEVNULL,
             ).returncode
             == 0
         ):
@@ -2099,7 +2123,10 @@ def execute_command(apt_cmd, extra_args):
 
         if (
             subprocess.run(
-                ["command", "-v", "lddd"], shell=True, capture_output=True
+                ["command", "-v", "lddd"],
+                shell=True,
+                stdout=subprocess.DEVNULL,
+                stderr=subprocess.DEVNULL,
             ).returncode
             == 0
         ):
@@ -2396,7 +2423,10 @@ def execute_command(apt_cmd, extra_args):
         # Check if pactree is installed
         if (
             subprocess.run(
-                ["command -v pactree"], shell=True, capture_output=True
+                ["command -v pactree"],
+                shell=True,
+                stdout=subprocess.DEVNULL,
+                stderr=subprocess.DEVNULL,
             ).returncode
             == 0
         ):
@@ -2528,7 +2558,10 @@ def execute_command(apt_cmd, extra_args):
             # Check if program is installed
             is_installed = (
                 subprocess.run(
-                    ["command", "-v", program], shell=True, capture_output=True
+                    ["command", "-v", program],
+                    shell=True,
+                    stdout=subprocess.DEVNULL,
+                    stderr=subprocess.DEVNULL,
                 ).returncode
                 == 0
             )
@@ -2581,7 +2614,12 @@ def execute_command(apt_cmd, extra_args):
         # For add/del, apt-key only prints "OK" on success
         if sub in ["add", "del", "delete", "remove"]:
             try:
-                subprocess.run(pacman_cmd, check=True, capture_output=True)
+                subprocess.run(
+                    pacman_cmd,
+                    check=True,
+                    stdout=subprocess.DEVNULL,
+                    stderr=subprocess.PIPE,
+                )
                 print("OK")
             except subprocess.CalledProcessError as e:
                 # pass through stderr if failed
@@ -2618,7 +2656,10 @@ def execute_command(apt_cmd, extra_args):
         # Check if man command is installed
         if (
             subprocess.run(
-                ["command", "-v", "man"], shell=True, capture_output=True
+                ["command", "-v", "man"],
+                shell=True,
+                stdout=subprocess.DEVNULL,
+                stderr=subprocess.DEVNULL,
             ).returncode
             != 0
         ):
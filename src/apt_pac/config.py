@@ -44,6 +44,7 @@ DEFAULT_CONFIG = {
     },
     "performance": {
         "rpc_cache_ttl": 30,  # minutes
+        "rpc_cache_max_entries": 10000,
     }
 }
 
@@ -101,6 +102,9 @@ locale_dir = ""
 [performance]
 # Time to live for AUR RPC cache in minutes (0 = disable cache)
 rpc_cache_ttl = 30
+
+# Maximum number of AUR RPC responses kept in the cache (oldest dropped first)
+rpc_cache_max_entries = 10000
 """
 
 def _get_config_dir() -> Optional[Path]:
@@ -10,6 +10,7 @@ using the Arch Build System (ABS) and the AUR.
 
 import subprocess
 import shutil
+from . import alpm_helper
 from .config import get_config
 from .ui import print_error, print_info, console, print_showsrc_info
 from .i18n import _
@@ -41,12 +42,9 @@ def get_sources_dir():
 
 def check_package_in_repos(package_name):
     """Check if package exists in official repositories."""
-    result = subprocess.run(
-        ["pacman", "-Si", package_name],
-        stdout=subprocess.DEVNULL,
-        stderr=subprocess.DEVNULL,
-    )
-    return result.returncode == 0
+    # Same lookup as `pacman -Si [repo/]name`, without spawning pacman
+    repo, _sep, name = package_name.rpartition("/")
+    return alpm_helper.get_package(name, repo or None) is not None
 
 
 def download_source(package_name, verbose=False):
@@ -89,5 +89,58 @@ class TestCacheCleaner(unittest.TestCase):
         self.assertEqual(freed, 1000)
         self.assertTrue((self.cache_dir / "test-1.0-1-x86_64.pkg.tar.zst").exists())
 
+class TestVercmpKey(unittest.TestCase):
+    # (older, newer) pairs, ordered as pacman's vercmp orders them
+    ORDERED = [
+        ("20240101-1", "1:0.5-1"),  # epoch beats any version
+        ("1:2.0-1", "2:1.0-1"),
+        ("1.0alpha-1", "1.0-1"),  # glued alpha suffix is a pre-release
+        ("1.0rc1-1", "1.0-1"),
+        ("1.0alpha-1", "1.0beta-1"),
+        ("1.0-1", "1.0.r5.gabc123-1"),  # separated alpha is newer
+        ("1.0.r5.gabc123-1", "1.0.r12.g0000000-1"),
+        ("1.0.r12.gabc-1", "1.0.1-1"),  # numeric beats alpha
+        ("1.0a-1", "1.0.1-1"),
+        ("1.0-1", "1.0.0-1"),
+        ("1.9-1", "1.10-1"),
+        ("1.0-2", "1.0-10"),  # pkgrel compared numerically
+        ("1.0-1", "1.0-1.1"),
+        ("1.0_1-1", "1.0_2-1"),
+    ]
+    # Pairs vercmp considers equal
+    EQUAL = [
+        ("1_0-1", "1.0-1"),  # one separator is as good as another
+        ("1.01-1", "1.1-1"),  # leading zeros are ignored
+        ("0:1.0-1", "1.0-1"),  # missing epoch is 0
+    ]
+
+    def test_ordering(self):
+        for older, newer in self.ORDERED:
+            with self.subTest(older=older, newer=newer):
+                self.assertLess(
+                    alpm_helper.vercmp_key(older), alpm_helper.vercmp_key(newer)
+                )
+
+    def test_equal(self):
+        for a, b in self.EQUAL:
+            with self.subTest(a=a, b=b):
+                self.assertEqual(
+                    alpm_helper.vercmp_key(a), alpm_helper.vercmp_key(b)
+                )
+
+    def test_sorts_snapshot_history(self):
+        versions = [
+            "1.0.r12.gdef-1",
+            "1.0-1",
+            "1.0.1-1",
+            "1.0rc1-1",
+            "1.0.r5.gabc-1",
+        ]
+        versions.sort(key=alpm_helper.vercmp_key)
+        self.assertEqual(
+            versions,
+            ["1.0rc1-1", "1.0-1", "1.0.r5.gabc-1", "1.0.r12.gdef-1", "1.0.1-1"],
+        )
+
 if __name__ == '__main__':
     unittest.main()
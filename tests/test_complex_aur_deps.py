@@ -110,17 +110,15 @@ class TestComplexAurDeps(unittest.TestCase):
 
         # Execute
         installer = aur.AurInstaller()
-        with patch("sys.exit"), patch("apt_pac.alpm_helper") as mock_alpm:
-            # Setup alpm repository check logic
-            def side_effect_repo(pkg):
-                if pkg in ["target-pkg", "aur-lib"]:
-                    return False
-                return True  # official-lib, base-devel
-
-            mock_alpm.is_in_official_repos.side_effect = side_effect_repo
-
-            # Setup is_installed check (simulate none installed)
-            mock_alpm.is_package_installed.return_value = False
+        with patch("sys.exit"), patch("apt_pac.aur.alpm_helper") as mock_alpm:
+            # Setup alpm repository contents (official-lib, base-devel)
+            mock_alpm.get_sync_pkg_names.return_value = frozenset(
+                ["official-lib", "base-devel"]
+            )
+            mock_alpm.get_repo_provides.return_value = {}
+
+            # Setup installed packages (simulate none installed)
+            mock_alpm.get_installed_packages.return_value = []
 
             installer.install(["target-pkg"])
         # VERIFICATION
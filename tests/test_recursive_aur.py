@@ -47,18 +47,20 @@ class TestRecursiveAur(unittest.TestCase):
         )
         self.mock_download = self.download_patcher.start()
 
-        # Mock is_installed (none installed)
-        self.installed_patcher = patch("apt_pac.aur.is_installed", return_value=False)
+        # Mock installed packages (none installed)
+        self.installed_patcher = patch(
+            "apt_pac.aur.get_installed_names", return_value=frozenset()
+        )
         self.mock_is_installed = self.installed_patcher.start()
 
-        # Mock is_in_official_repos (False for AUR pkgs)
+        # Mock official repo names (none of the AUR pkgs)
         self.official_patcher = patch(
-            "apt_pac.aur.is_in_official_repos", return_value=False
+            "apt_pac.aur.get_official_names", return_value=frozenset()
         )
         self.mock_is_official = self.official_patcher.start()
 
         # Mock glob for package file finding
-        self.glob_patcher = patch("pathlib.Path.glob")
+        self.glob_patcher = patch("apt_pac.aur._find_pkgs")
         self.mock_glob = self.glob_patcher.start()
         # Return a mock package file
         mock_pkg = MagicMock()
@@ -190,5 +192,70 @@ class TestRecursiveAur(unittest.TestCase):
                 self.assertIn("--noconfirm", cmd)
 
 
+class TestAurResolverOrder(unittest.TestCase):
+    """AurResolver on an in-memory AUR graph: build order and cycle reports."""
+
+    def _resolve(self, graph, packages):
+        # graph: package name -> list of AUR deps
+        def side_effect_rpc(pkgs):
+            return [
+                {
+                    "Name": p,
+                    "PackageBase": p,
+                    "Version": "1.0-1",
+                    "Depends": graph[p],
+                }
+                for p in pkgs
+                if p in graph
+            ]
+
+        with (
+            patch("apt_pac.aur.get_aur_info", side_effect=side_effect_rpc),
+            patch("apt_pac.aur.get_installed_names", return_value=frozenset()),
+            patch("apt_pac.aur.get_official_names", return_value=frozenset()),
+        ):
+            return aur.AurResolver().resolve(packages)
+
+    def test_build_order_is_post_order(self):
+        graph = {"app": ["lib-a", "lib-b"], "lib-a": ["lib-b"], "lib-b": []}
+        queue = self._resolve(graph, ["app"])
+        self.assertEqual([p["Name"] for p in queue], ["lib-b", "lib-a", "app"])
+
+    def test_reports_every_cycle(self):
+        graph = {"a": ["b"], "b": ["a"], "x": ["y"], "y": ["x"]}
+        with self.assertRaises(aur.CyclicDependencyError) as ctx:
+            self._resolve(graph, ["a", "x"])
+        self.assertIn("a → b → a; x → y → x", str(ctx.exception))
+        self.assertEqual(
+            ctx.exception.cycles, [["a", "b", "a"], ["x", "y", "x"]]
+        )
+
+    def test_self_dependency_is_a_cycle(self):
+        with self.assertRaises(aur.CyclicDependencyError) as ctx:
+            self._resolve({"self-dep": ["self-dep"]}, ["self-dep"])
+        self.assertEqual(ctx.exception.cycles, [["self-dep", "self-dep"]])
+
+    def test_cycle_attribute_is_backward_compatible(self):
+        with self.assertRaises(aur.CyclicDependencyError) as ctx:
+            self._resolve({"a": ["b"], "b": ["c"], "c": ["a"]}, ["a"])
+        # .cycle is still one path that starts and ends on the same package
+        self.assertEqual(ctx.exception.cycle, ["a", "b", "c", "a"])
+
+        # The old single-path constructor still works
+        e = aur.CyclicDependencyError(["a", "b", "a"])
+        self.assertEqual(e.cycle, ["a", "b", "a"])
+        self.assertEqual(e.cycles, [["a", "b", "a"]])
+        self.assertEqual(str(e), "Dependency cycle detected: a → b → a")
+
+    def test_deep_chain_has_no_recursion_limit(self):
+        depth = 3000
+        graph = {f"pkg{i}": [f"pkg{i + 1}"] for i in range(depth - 1)}
+        graph[f"pkg{depth - 1}"] = []
+        queue = self._resolve(graph, ["pkg0"])
+        self.assertEqual(len(queue), depth)
+        self.assertEqual(queue[0]["Name"], f"pkg{depth - 1}")
+        self.assertEqual(queue[-1]["Name"], "pkg0")
+
+
 if __name__ == "__main__":
     unittest.main()
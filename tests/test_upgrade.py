@@ -73,7 +73,7 @@ class TestUpgrade(unittest.TestCase):
                 "apt_pac.aur.AurInstaller._download_source_silent", return_value=True
             ),
             patch.dict(os.environ, {"SUDO_USER": "testuser"}),
-            patch("pathlib.Path.glob") as mock_glob,
+            patch("apt_pac.aur._find_pkgs") as mock_glob,
         ):
             # Mock AUR updates
             mock_aur_installed.return_value = ["aur-pkg"]
@@ -182,7 +182,7 @@ class TestUpgrade(unittest.TestCase):
                 "apt_pac.aur.AurInstaller._download_source_silent", return_value=True
             ),
             patch.dict(os.environ, {"SUDO_USER": "testuser"}),
-            patch("pathlib.Path.glob") as mock_glob,
+            patch("apt_pac.aur._find_pkgs") as mock_glob,
         ):
             # Mock AUR updates
             mock_aur_installed.return_value = ["aur-pkg"]
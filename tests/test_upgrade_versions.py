@@ -26,7 +26,7 @@ class TestUpgradeVersions(unittest.TestCase):
     @patch("os.getuid", return_value=0)
     @patch("apt_pac.aur.check_updates", return_value=[])
     @patch("apt_pac.aur.get_installed_aur_packages", return_value=[])
-    @patch("pathlib.Path.glob")
+    @patch("apt_pac.aur._find_pkgs")
     @patch("builtins.input", return_value="y")
     def test_upgrade_official_version(
         self,
@@ -126,7 +126,7 @@ class TestUpgradeVersions(unittest.TestCase):
     @patch("os.getuid", return_value=0)
     @patch("apt_pac.aur.check_updates", return_value=[])
     @patch("apt_pac.aur.get_installed_aur_packages", return_value=[])
-    @patch("pathlib.Path.glob")
+    @patch("apt_pac.aur._find_pkgs")
     @patch("builtins.input", return_value="y")
     def test_upgrade_aur_version(
         self,